@@ -1,141 +1,105 @@
-import streamlit as st
+import time
+
 import pandas as pd
-import plotly.express as px
+import streamlit as st
+import plotly.graph_objects as go
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from risk_engine import ALLIANCE_TYPES, FLAGS, RESULT_CACHE, evaluate, get_calc, query_key, unmatched_customers
+from risk_engine.charts import country_bar
+from risk_engine.paging import page, page_count
+from risk_engine.periods import period_cube, period_totals, period_trends
+from risk_engine.profiling import Profiler, profiling_enabled
+from risk_engine.simulation import CorridorOverride, PriceOverride, simulate, sweep
+from risk_engine.store import SESSIONS, memory_report
+from risk_engine.validation import ValidationError, validate_inputs
+from risk_engine.watcher import get_watcher
+from risk_engine.writers import FORMATS, file_name, to_bytes
+
+if pd.__version__.split(".")[0] == "2":
+    # Frames are handed to every session; Copy-on-Write (the default from
+    # pandas 3) keeps a session's modifications from reaching the shared data
+    pd.set_option("mode.copy_on_write", True)
 
 st.set_page_config(page_title="Risk Analysis Tool", layout="wide")
+
+
+def download_buttons(frame, stem, columns=None):
+    """Parquet/CSV/Excel downloads of the unstyled frame, written only when clicked."""
+    for col, (fmt, label) in zip(st.columns(len(FORMATS)), [("parquet", "Parquet"), ("csv", "CSV"), ("xlsx", "Excel")]):
+        col.download_button(
+            f"Download {label}",
+            data=lambda fmt=fmt: to_bytes(frame, fmt, columns),
+            file_name=file_name(stem, fmt),
+            mime=FORMATS[fmt][1],
+            on_click="ignore",
+            key=f"download_{stem}_{fmt}",
+        )
+
+
+def show_drilldown(view, country, category=None):
+    """The min-price sources and transactions behind one aggregate row, from the view's index."""
+    drill = view.drilldown
+    label = country if category is None else f"{country} / {category}"
+    st.markdown(f"**Drill-down: {label}**")
+    st.caption("Min-price sources (Comparable, Alliance) and the generating transaction that sets each min price")
+    st.dataframe(drill.sources(country, category).drop(columns="Generating Row").style.format({
+        "Net Sales": "{:,.0f}", "Risk": "{:,.0f}", "Min Price": "{:,.2f}",
+    }, na_rep=""), hide_index=True)
+    contributions = drill.contributions(country, category)
+    st.caption(f"{len(contributions):,} contributing transactions, largest Risk first")
+    st.dataframe(contributions.head(500).style.format({
+        "Net Sales": "{:,.0f}", "Risk": "{:,.0f}", "% Risk": "{:.2%}", "Comparable Price": "{:,.2f}", "Min Price": "{:,.2f}",
+    }), hide_index=True)
+
+
 st.title("Risk Analysis Tool")
 
+# Stage timings/memory for this rerun (also on with RISK_PROFILE=1)
+profiler = Profiler(enabled=st.sidebar.toggle("Profile this run", value=profiling_enabled()))
+
 # === 1. Load files directly from repo ===
-export = pd.read_excel("Export.xlsx")
-product_registry = pd.read_excel("Product Registry.xlsx")
-mapping_ba = pd.read_excel("Mapping BA.xlsx", usecols=[0, 1], names=["Customer Name", "Alliance"], header=0)
-mapping_ia = pd.read_excel("Mapping IA.xlsx", usecols=[0, 1], names=["Customer Name", "Alliance"], header=0)
-corridors = pd.read_excel("Corridors.xlsx")
-mapping_area = pd.read_excel("Mapping Area.xlsx")
+# Parsed once per file version and served from the process-wide cache; a
+# background watcher rebuilds changed workbooks and swaps the new version in
+with profiler.stage("load inputs") as stage:
+    try:
+        watcher = get_watcher()
+    except ValidationError as exc:
+        # RISK_VALIDATION=block rejected the first version: show why instead of a traceback
+        st.error("The input workbooks failed the data checks; fix them and reload the page.")
+        st.dataframe(exc.report.issues.drop(columns="Check"), hide_index=True)
+        st.stop()
+    inputs = watcher.current
+    stage.rows_out = len(inputs.export)
+corridors = inputs.corridor_index
+
+# Pre-flight checks, run once per input version when it was loaded
+checks = validate_inputs(inputs)
+if not checks.multiplying.empty:
+    st.sidebar.warning("Some input joins multiply export rows; see Data checks")
+elif not checks.errors.empty:
+    st.sidebar.warning("Some input keys conflict; see Data checks")
+with st.sidebar.expander(f"Data checks ({len(checks.issues)} issues)"):
+    if checks.ok:
+        st.caption("No issues found in the input workbooks")
+    else:
+        st.dataframe(checks.issues.drop(columns="Check"), hide_index=True)
 
 # === 2. Alliance toggle (3 options) ===
-alliance_type = st.sidebar.radio("Alliance Mapping", ["Buying Alliance", "International Alliance", "Modern Trade"])
-
-calc = export.copy()
-
-if alliance_type == "Buying Alliance":
-    mapping = mapping_ba
-    calc = calc.merge(
-        mapping,
-        how="left",
-        left_on="Customer Hierarchy - Customer",
-        right_on="Customer Name"
-    ).drop(columns=["Customer Name"])
-
-elif alliance_type == "International Alliance":
-    mapping = mapping_ia
-    calc = calc.merge(
-        mapping,
-        how="left",
-        left_on="Customer Hierarchy - Customer",
-        right_on="Customer Name"
-    ).drop(columns=["Customer Name"])
-
-else:  # Modern Trade
-    calc["Alliance"] = calc["Customer Hierarchy - Customer"].apply(
-        lambda x: "Modern Trade" if str(x).strip().lower() == "modern trade" else None
-    )
-
-# Exclude rows with NaN in Alliance by default
-calc = calc[calc["Alliance"].notna()].copy()
+alliance_type = st.sidebar.radio("Alliance Mapping", ALLIANCE_TYPES)
 
 # === 3. Build Calculations ===
-# Comparable
-calc = calc.merge(
-    product_registry[["Product Hierarchy - Product", "Product Hierarchy - Comparable Product"]],
-    how="left",
-    on="Product Hierarchy - Product"
-).rename(columns={"Product Hierarchy - Comparable Product": "Comparable"})
-
-# Category
-comp_to_cat = product_registry[[
-    "Product Hierarchy - Comparable Product", "Product Hierarchy - Category"
-]].drop_duplicates().rename(columns={
-    "Product Hierarchy - Comparable Product": "Comparable",
-    "Product Hierarchy - Category": "Category"
-})
-calc = calc.merge(comp_to_cat, how="left", on="Comparable")
-
-# Mapping Area
-calc = calc.merge(
-    mapping_area.rename(columns={"Country": "Sellin Country Hierarchy - Country"}),
-    how="left",
-    on="Sellin Country Hierarchy - Country"
-)
-
-# Prepare corridors lookup
-corridors_lookup = corridors[["Country", "Attribute", "Corridor Min", "Corridor Max"]]
-
-
-# === Helper function to recalculate after filters ===
-def recalculate(df, flag):
-    df = df.copy()
-
-    # Comparable Volumes & Prices
-    df["Comparable Volumes"] = df.groupby(
-        ["Comparable", "Sellin Country Hierarchy - Country", "Customer Hierarchy - Customer"]
-    )["Volumes [q]"].transform("sum")
-
-    df["Weighted Price Sum"] = df["3Net Price [EUR/kg]"] * df["Volumes [q]"]
-    grouped_price = df.groupby(
-        ["Comparable", "Sellin Country Hierarchy - Country", "Customer Hierarchy - Customer"]
-    )["Weighted Price Sum"].transform("sum")
-    df["Comparable Price"] = grouped_price / df["Comparable Volumes"]
-
-    # Min Price + Min Country + Min Customer (recalculated each time)
-    df["Min Price"] = df.groupby(["Comparable", "Alliance"])["Comparable Price"].transform("min")
-
-    min_price_country = df.loc[
-        df.groupby(["Comparable", "Alliance"])["Comparable Price"].idxmin(),
-        ["Comparable", "Alliance", "Sellin Country Hierarchy - Country"]
-    ].rename(columns={"Sellin Country Hierarchy - Country": "Generating Country"})
-
-    min_price_customer = df.loc[
-        df.groupby(["Comparable", "Alliance"])["Comparable Price"].idxmin(),
-        ["Comparable", "Alliance", "Customer Hierarchy - Customer"]
-    ].rename(columns={"Customer Hierarchy - Customer": "Generating Customer"})
-
-    df = df.drop(columns=["Generating Country", "Generating Customer"], errors="ignore")
-    df = df.merge(min_price_country, how="left", on=["Comparable", "Alliance"])
-    df = df.merge(min_price_customer, how="left", on=["Comparable", "Alliance"])
-
-    # Corridors - join twice
-    # Max Corridor by Suffering Country
-    df = df.merge(
-        corridors_lookup[["Country", "Attribute", "Corridor Max"]].rename(columns={"Corridor Max": "Max Corridor"}),
-        how="left",
-        left_on=["Sellin Country Hierarchy - Country", "Category"],
-        right_on=["Country", "Attribute"]
-    ).drop(columns=["Country", "Attribute"], errors="ignore")
-
-    # Min Corridor by Generating Country
-    df = df.merge(
-        corridors_lookup[["Country", "Attribute", "Corridor Min"]].rename(columns={"Corridor Min": "Min Corridor"}),
-        how="left",
-        left_on=["Generating Country", "Category"],
-        right_on=["Country", "Attribute"]
-    ).drop(columns=["Country", "Attribute"], errors="ignore")
-
-    # Calculations
-    df["Operating Corridor"] = df["Max Corridor"] / df["Min Corridor"]
-    df["Net Sales"] = df["Comparable Price"] * df["Volumes [q]"]
-    df["Min Price Net Sales"] = df["Min Price"] * df["Volumes [q]"]
-    df["Risk"] = (df["Net Sales"] - df["Min Price Net Sales"] * df["Operating Corridor"]).clip(lower=0).fillna(0)
-    df["% Risk"] = df["Risk"] / df["Net Sales"]
-
-    # Rename for display
-    df = df.rename(columns={
-        "Sellin Country Hierarchy - Country": "Suffering Country",
-        "Customer Hierarchy - Customer": "Suffering Customer"
-    })
-
-    return df
-
+# Joined once per input version and alliance mapping, so toggling the radio
+# doesn't redo the merges
+with profiler.stage("enrichment", rows_in=len(inputs.export)) as stage:
+    calc = get_calc(inputs, alliance_type)
+    stage.rows_out = len(calc)
+
+# Export customers this mapping doesn't know (matched ignoring case and spacing)
+unmatched = unmatched_customers(inputs, alliance_type)
+with st.sidebar.expander(f"Unmatched customers ({len(unmatched)})"):
+    st.caption(f"{unmatched['Rows'].sum():,} export rows have no {alliance_type} alliance and are excluded")
+    st.dataframe(unmatched.style.format({"Volumes": "{:,.0f}"}), hide_index=True)
 
 # === 4. Sidebar filters ===
 st.sidebar.header("Filters")
@@ -144,32 +108,53 @@ paesi = st.sidebar.multiselect("Countries", sorted(calc["Sellin Country Hierarch
 categorie = st.sidebar.multiselect("Categories", sorted(calc["Category"].dropna().unique()))
 alliances_list = sorted([x for x in calc["Alliance"].dropna().unique()])
 alleanze = st.sidebar.multiselect("Alliance", alliances_list)
-flag = st.sidebar.radio("Risk Type", ["suffered", "generated"])
+flag = st.sidebar.radio("Risk Type", FLAGS)
+aggregate_first = st.sidebar.toggle(
+    "Aggregate-first mode", help="Answer the aggregates from a pre-aggregated cube and build the detailed table only when shown"
+)
 
-df = calc.copy()
-if areas:
-    df = df[df["Area"].isin(areas)]
-if paesi:
-    df = df[df["Sellin Country Hierarchy - Country"].isin(paesi)]
-if categorie:
-    df = df[df["Category"].isin(categorie)]
-if alleanze:
-    df = df[df["Alliance"].isin(alleanze)]
+filters = {
+    "Area": areas,
+    "Sellin Country Hierarchy - Country": paesi,
+    "Category": categorie,
+    "Alliance": alleanze,
+}
+# Views are shared across reruns and sessions; comparable aggregates don't
+# depend on the filters and are reused from calc on a miss
+with profiler.stage("filter + recalculate + aggregate", rows_in=len(calc)) as stage:
+    hits_before = RESULT_CACHE.hits
+    view_key = query_key(inputs.version, alliance_type, filters, flag, aggregate_first=aggregate_first)
+    view = RESULT_CACHE.get_or_compute(
+        view_key,
+        lambda: evaluate(calc, corridors, filters, flag, aggregate_first=aggregate_first),
+    )
+    stage.rows_out = len(view.cube) if aggregate_first else len(view.detail)
+    stage.note = "cache hit" if RESULT_CACHE.hits > hits_before else "cache miss"
+agg, agg2, group_col = view.agg, view.agg2, view.group_col
+
+cache_stats = RESULT_CACHE.stats()
+st.sidebar.caption(
+    f"Result cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses, "
+    f"{cache_stats['entries']} views ({cache_stats['bytes'] / 2**20:,.1f} MB)"
+)
 
-df = recalculate(df, flag)
+# Every session reads the same process-wide frames; only the selections above
+# are per session
+ctx = get_script_run_ctx()
+SESSIONS.touch(ctx.session_id if ctx else "local")
+if watcher.rebuilding:
+    st.sidebar.info("New input files detected, loading in the background...")
+if watcher.error:
+    st.sidebar.warning(f"Could not reload {watcher.error}; showing the previous data")
+st.sidebar.caption(f"Data loaded {time.strftime('%Y-%m-%d %H:%M', time.localtime(watcher.loaded_at))}")
+
+memory = memory_report()
+st.sidebar.caption(
+    f"Memory: {memory['rss'] / 2**20:,.0f} MB process, {memory['shared'] / 2**20:,.1f} MB shared data, "
+    f"{memory['sessions']} active sessions ({memory['unshared_per_session'] / 2**20:,.0f} MB non-shared per session)"
+)
 
 # === 5. Aggregated by Country ===
-if flag == "suffered":
-    group_col = "Suffering Country"
-else:
-    group_col = "Generating Country"
-
-agg = df.groupby(group_col).agg({
-    "Net Sales": "sum",
-    "Risk": "sum"
-}).reset_index()
-agg["% Risk"] = agg["Risk"] / agg["Net Sales"]
-
 # Totals in title
 total_risk = agg["Risk"].sum()
 total_net_sales = agg["Net Sales"].sum()
@@ -177,31 +162,31 @@ total_pct = total_risk / total_net_sales if total_net_sales else 0
 
 st.subheader("Aggregated Risk by Country")
 st.markdown(f"**Total Risk: {total_risk:,.0f} | Total Net Sales: {total_net_sales:,.0f} | % Risk: {total_pct:.2%}**")
-st.dataframe(agg.reset_index(drop=True).style.format({"Net Sales": "{:,.0f}", "Risk": "{:,.0f}", "% Risk": "{:.2%}"}))
+with profiler.stage("render country table", rows_in=len(agg)):
+    selected = st.dataframe(
+        agg.style.format({"Net Sales": "{:,.0f}", "Risk": "{:,.0f}", "% Risk": "{:.2%}"}),
+        # Keyed by the view, so a selection doesn't carry over to other rows
+        # when the filters, flag or data change
+        on_select="rerun", selection_mode="single-row", key=f"country_table_{view_key[:16]}",
+    ).selection.rows
+download_buttons(agg, "risk_by_country")
+# Select a row to see the transactions behind it
+if selected and selected[0] < len(agg):
+    with profiler.stage("drill-down"):
+        show_drilldown(view, agg[group_col].iloc[selected[0]])
 
 # === Bar chart ===
-fig = px.bar(
-    agg,
-    x=group_col,
-    y=["Net Sales", "Risk"],
-    barmode="overlay",
-    title="Net Sales vs Risk by Country",
-    color_discrete_map={
-        "Net Sales": "steelblue",
-        "Risk": "crimson"
-    }
+# Cached per aggregate content; large axes show the top countries plus "Other"
+chart_options = [None, 10, 25, 50]
+top = st.selectbox(
+    "Countries in chart", chart_options, index=0 if len(agg) <= 50 else 2,
+    format_func=lambda n: "All" if n is None else f"Top {n} + Other",
 )
-fig.update_traces(opacity=0.8)
-st.plotly_chart(fig, use_container_width=True)
+with profiler.stage("render chart", rows_in=len(agg)):
+    st.plotly_chart(country_bar(agg, group_col, top), use_container_width=True)
 
 
 # === 6. Aggregated by Country + Category ===
-agg2 = df.groupby([group_col, "Category"]).agg({
-    "Net Sales": "sum",
-    "Risk": "sum"
-}).reset_index()
-agg2["% Risk"] = agg2["Risk"] / agg2["Net Sales"]
-
 # Totals in title
 total_risk2 = agg2["Risk"].sum()
 total_net_sales2 = agg2["Net Sales"].sum()
@@ -209,22 +194,140 @@ total_pct2 = total_risk2 / total_net_sales2 if total_net_sales2 else 0
 
 st.subheader("Aggregated Risk by Country and Category")
 st.markdown(f"**Total Risk: {total_risk2:,.0f} | Total Net Sales: {total_net_sales2:,.0f} | % Risk: {total_pct2:.2%}**")
-st.dataframe(agg2.reset_index(drop=True).style.format({"Net Sales": "{:,.0f}", "Risk": "{:,.0f}", "% Risk": "{:.2%}"}))
+with profiler.stage("render country x category table", rows_in=len(agg2)):
+    selected = st.dataframe(
+        agg2.style.format({"Net Sales": "{:,.0f}", "Risk": "{:,.0f}", "% Risk": "{:.2%}"}),
+        on_select="rerun", selection_mode="single-row", key=f"country_category_table_{view_key[:16]}",
+    ).selection.rows
+download_buttons(agg2, "risk_by_country_category")
+if selected and selected[0] < len(agg2):
+    with profiler.stage("drill-down"):
+        show_drilldown(view, agg2[group_col].iloc[selected[0]], agg2["Category"].iloc[selected[0]])
+
+
+# === What-if simulation ===
+# Sweeps one corridor or one customer's net price over a range of changes;
+# only the rows the change can reach are recomputed for each scenario
+with st.expander("What-if simulation"):
+    target = st.radio("Change", ["Corridor", "Customer net price"], horizontal=True)
+    col_a, col_b, col_c = st.columns(3)
+    if target == "Corridor":
+        corridor_country = col_a.selectbox("Corridor country", sorted(inputs.corridors["Country"].dropna().unique()))
+        corridor_category = col_b.selectbox("Corridor category", sorted(inputs.corridors["Attribute"].dropna().unique()))
+        corridor_column = col_c.radio("Bound", ["Corridor Max", "Corridor Min"])
+    else:
+        customer = col_a.selectbox("Customer", sorted(calc["Customer Hierarchy - Customer"].dropna().unique()))
+    low, high = st.slider("Change range (%)", -50, 50, (-5, 5))
+    steps = st.number_input("Scenarios", min_value=2, max_value=501, value=11)
+
+    if st.toggle("Run simulation"):
+        factors = sweep(low / 100, high / 100, int(steps))
+        if target == "Corridor":
+            override = CorridorOverride(corridor_country, corridor_category, corridor_column, factors)
+        else:
+            override = PriceOverride(factors, {"Customer Hierarchy - Customer": [customer]})
+        scenario_labels = [f"{f - 1:+.2%}" for f in factors]
+        try:
+            with profiler.stage("what-if simulation", rows_in=len(calc)) as stage:
+                simulation = simulate(calc, corridors, filters, flag, [override], labels=scenario_labels)
+                stage.rows_out = simulation.affected_rows
+        except ValueError as exc:
+            st.warning(str(exc))
+        else:
+            st.caption(f"{simulation.affected_rows:,} rows affected and recomputed per scenario")
+            st.dataframe(simulation.totals.style.format({
+                "Net Sales": "{:,.0f}", "Risk": "{:,.0f}", "% Risk": "{:.2%}",
+                "Delta Net Sales": "{:+,.0f}", "Delta Risk": "{:+,.0f}",
+            }), hide_index=True)
+            scenario = st.selectbox("Scenario by country", scenario_labels, index=len(scenario_labels) - 1)
+            by_country = simulation.by_country[simulation.by_country["Scenario"] == scenario]
+            by_country = by_country[by_country["Delta Risk"] != 0].sort_values("Delta Risk", key=abs, ascending=False)
+            st.dataframe(by_country.drop(columns="Scenario").style.format({
+                "Net Sales": "{:,.0f}", "Risk": "{:,.0f}", "% Risk": "{:.2%}",
+                "Delta Net Sales": "{:+,.0f}", "Delta Risk": "{:+,.0f}",
+            }), hide_index=True)
 
 
 # === 7. Detailed Table ===
 st.subheader("Detailed Risk Table")
 
-# Show all columns for sense check
-all_cols = df.columns.tolist()
-st.dataframe(df[all_cols].reset_index(drop=True).style.format({
-    "Comparable Price": "{:,.2f}",
-    "3Net Price [EUR/kg]": "{:,.2f}",
-    "Min Price": "{:,.2f}",
-    "Net Sales": "{:,.0f}",
-    "Min Price Net Sales": "{:,.0f}",
-    "Risk": "{:,.0f}",
-    "% Risk": "{:.2%}",
-    "Operating Corridor": "{:,.2f}",
-    "Comparable Volumes": "{:,.0f}"
-}))
+# In aggregate-first mode the detailed table is only built once it is shown
+show_detail = not aggregate_first or st.toggle("Show detailed table")
+if not show_detail:
+    st.caption("The detailed table is built when shown.")
+else:
+    df = view.detail
+
+    # Only the visible page is sorted into view and formatted; the full table is
+    # available unstyled through the download buttons
+    detail_formats = {
+        "Comparable Price": "{:,.2f}",
+        "3Net Price [EUR/kg]": "{:,.2f}",
+        "Min Price": "{:,.2f}",
+        "Net Sales": "{:,.0f}",
+        "Min Price Net Sales": "{:,.0f}",
+        "Risk": "{:,.0f}",
+        "% Risk": "{:.2%}",
+        "Operating Corridor": "{:,.2f}",
+        "Comparable Volumes": "{:,.0f}"
+    }
+
+    all_cols = df.columns.tolist()
+    col_a, col_b, col_c, col_d = st.columns([3, 2, 1, 1])
+    detail_cols = col_a.multiselect("Columns", all_cols, default=all_cols)
+    sort_by = col_b.selectbox("Sort by", [None] + all_cols, format_func=lambda c: "(none)" if c is None else c)
+    ascending = col_c.radio("Order", ["Ascending", "Descending"]) == "Ascending"
+    page_size = col_d.selectbox("Rows per page", [50, 100, 250, 500], index=1)
+    n_pages = page_count(len(df), page_size)
+    page_number = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1)
+
+    with profiler.stage("render detail page", rows_in=len(df)) as stage:
+        visible = page(df, page_number - 1, page_size, sort_by, ascending, detail_cols or all_cols)
+        st.caption(f"Rows {(page_number - 1) * page_size + 1:,}-{(page_number - 1) * page_size + len(visible):,} of {len(df):,}")
+        st.dataframe(visible.reset_index(drop=True).style.format(
+            {c: f for c, f in detail_formats.items() if c in visible.columns}
+        ))
+        stage.rows_out = len(visible)
+
+    # The full table (selected columns), streamed to the file only on click
+    download_buttons(df, "detailed_risk", detail_cols or all_cols)
+
+
+# === 8. Risk trend by period ===
+# Every export snapshot (periods.json, or Export old.xlsx + Export.xlsx) with
+# the current filters; periods already in the store are not recomputed
+st.subheader("Risk Trend by Period")
+if st.toggle("Show period trend"):
+    try:
+        with profiler.stage("period trend") as stage:
+            period_data = period_cube(".", alliance_type, filters)
+            trends = period_trends(period_data, flag)
+            stage.rows_out = len(trends)
+    except ValueError as exc:
+        st.warning(str(exc))
+    else:
+        totals = period_totals(trends)
+        trend_fig = go.Figure(
+            data=[go.Scatter(x=totals["Period"].astype(str), y=totals["Risk"], mode="lines+markers", name="Risk")],
+            layout=go.Layout(title="Total Risk by Period", xaxis_title="Period", yaxis_title="Risk"),
+        )
+        st.plotly_chart(trend_fig, use_container_width=True)
+        st.dataframe(totals.style.format({
+            "Net Sales": "{:,.0f}", "Risk": "{:,.0f}", "% Risk": "{:.2%}", "Delta Risk": "{:+,.0f}",
+        }, na_rep=""), hide_index=True)
+
+        # One row per country, one Risk column per period, plus the latest change
+        by_period = trends.pivot_table(index=group_col, columns="Period", values="Risk", observed=False, sort=False)
+        by_period.columns = by_period.columns.astype(str)
+        if by_period.shape[1] > 1:
+            by_period["Delta Risk"] = by_period.iloc[:, -1] - by_period.iloc[:, -2]
+            by_period = by_period.sort_values("Delta Risk", key=abs, ascending=False)
+        st.dataframe(by_period.style.format("{:,.0f}", na_rep=""))
+
+
+# === Profiling ===
+if profiler.enabled:
+    timings = profiler.to_frame()
+    with st.expander(f"Profiling: {timings['seconds'].sum() * 1000:,.0f} ms in {len(timings)} stages"):
+        st.dataframe(timings.style.format({"seconds": "{:.4f}", "peak_mb": "{:,.1f}"}, na_rep=""))
+    profiler.write_log(alliance=alliance_type, flag=flag)
@@ -0,0 +1,87 @@
+"""Compare the pandas and Polars backends on synthetic data.
+
+    python benchmarks/bench_backends.py --rows 100000 1000000 3000000
+
+For each size and alliance mapping both backends evaluate the section 5/6
+aggregates from the same inputs (pandas: enrichment + recalculate +
+aggregation; Polars: the whole lazy plan). Before timing, the aggregates and
+the detailed table of the two backends are checked for parity.
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import generate_inputs  # noqa: E402
+
+from risk_engine import ALLIANCE_TYPES, enrich, evaluate  # noqa: E402
+from risk_engine import polars_backend  # noqa: E402
+
+FLAG = "suffered"
+
+
+def _plain(frame):
+    """Categoricals as strings, so both backends compare on values."""
+    return frame.astype({c: str for c in frame.columns if not pd.api.types.is_numeric_dtype(frame[c])})
+
+
+def check_parity(inputs, alliance_type, filters, flag=FLAG, rtol=1e-9):
+    expected = evaluate(enrich(inputs, alliance_type), inputs.corridor_index, filters, flag)
+    actual = polars_backend.evaluate(inputs, alliance_type, filters, flag)
+    for name in ("agg", "agg2", "detail"):
+        pd.testing.assert_frame_equal(_plain(getattr(actual, name)), _plain(getattr(expected, name)),
+                                      check_dtype=False, rtol=rtol, obj=f"{alliance_type} {name}")
+
+
+def run_pandas(inputs, alliance_type):
+    view = evaluate(enrich(inputs, alliance_type), inputs.corridor_index, {}, FLAG)
+    return view.agg, view.agg2
+
+
+def run_polars(inputs, alliance_type):
+    view = polars_backend.evaluate(inputs, alliance_type, {}, FLAG)
+    return view.agg, view.agg2
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--comparables", type=int, default=200)
+    parser.add_argument("--customers", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-check", action="store_true", help="skip the parity check")
+    args = parser.parse_args(argv)
+    warnings.simplefilter("ignore")
+
+    results = []
+    for rows in args.rows:
+        print(f"rows={rows:,}", file=sys.stderr)
+        inputs = generate_inputs(rows, args.comparables, args.customers)
+        for alliance_type in ALLIANCE_TYPES:
+            if not args.no_check:
+                check_parity(inputs, alliance_type, {})
+            pandas_s = best_of(args.repeat, lambda: run_pandas(inputs, alliance_type))
+            polars_s = best_of(args.repeat, lambda: run_polars(inputs, alliance_type))
+            results.append({"rows": rows, "alliance": alliance_type, "pandas": pandas_s,
+                            "polars": polars_s, "speedup": pandas_s / polars_s})
+
+    print(pd.DataFrame(results).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Memory and recalculate() time of the risk model with and without dictionary encoding.
+
+Usage: python benchmarks/bench_encoding.py [--repeat N] [--scale K]
+
+``--scale`` stacks the export K times to approximate a larger input.
+"""
+
+import argparse
+import os
+import sys
+import time
+from dataclasses import replace
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from risk_engine import ALLIANCE_TYPES, enrich, load_inputs, recalculate  # noqa: E402
+from risk_engine.encoding import encode_inputs  # noqa: E402
+
+
+def _mb(frame):
+    return frame.memory_usage(deep=True).sum() / 1e6
+
+
+def _measure(inputs, repeat):
+    rows = []
+    for alliance_type in ALLIANCE_TYPES:
+        calc = enrich(inputs, alliance_type)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = recalculate(calc, inputs.corridor_index)
+        elapsed = (time.perf_counter() - start) / repeat
+        rows.append({
+            "alliance": alliance_type,
+            "rows": len(calc),
+            "calc MB": _mb(calc),
+            "result MB": _mb(result),
+            "recalculate ms": elapsed * 1000,
+        })
+    return pd.DataFrame(rows).set_index("alliance")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--data-dir", default=".")
+    args = parser.parse_args(argv)
+
+    raw = load_inputs(args.data_dir, encode=False)
+    if args.scale > 1:
+        raw = replace(
+            raw,
+            export=pd.concat([raw.export] * args.scale, ignore_index=True),
+            versions={**raw.versions, "export": f"{raw.versions['export']}x{args.scale}"},
+        )
+    encoded = encode_inputs(raw)
+
+    before = _measure(raw, args.repeat)
+    after = _measure(encoded, args.repeat)
+
+    print(f"export: {_mb(raw.export):.1f} MB object -> {_mb(encoded.export):.1f} MB encoded")
+    report = before.join(after, lsuffix=" (object)", rsuffix=" (encoded)")
+    report["memory saved"] = 1 - report["calc MB (encoded)"] / report["calc MB (object)"]
+    print(report.to_string(float_format=lambda x: f"{x:,.2f}"))
+
+
+if __name__ == "__main__":
+    main()
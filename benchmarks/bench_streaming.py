@@ -0,0 +1,60 @@
+"""Peak memory and time of the Export readers.
+
+Usage: python benchmarks/bench_streaming.py [--file "Export old.xlsx"] [--chunk-size N]
+
+Compares ``pd.read_excel`` on the whole sheet, ``pd.read_excel`` restricted to
+the model columns and ``read_export_streaming``. Peak memory is the Python heap
+high-water mark reported by tracemalloc (numpy buffers included).
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from risk_engine.streaming import EXPORT_COLUMNS, read_export_streaming  # noqa: E402
+
+
+def _measure(read):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    frame = read()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "rows": len(frame),
+        "seconds": elapsed,
+        "peak MB": peak / 1e6,
+        "frame MB": frame.memory_usage(deep=True).sum() / 1e6,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", default="Export.xlsx")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args(argv)
+    warnings.simplefilter("ignore")
+
+    readers = {
+        "read_excel (all columns)": lambda: pd.read_excel(args.file),
+        "read_excel (model columns)": lambda: pd.read_excel(args.file, usecols=EXPORT_COLUMNS),
+        "streaming": lambda: read_export_streaming(args.file, chunk_size=args.chunk_size),
+    }
+    report = pd.DataFrame({name: _measure(read) for name, read in readers.items()}).T
+    report["peak vs read_excel"] = report["peak MB"] / report.loc["read_excel (all columns)", "peak MB"]
+    print(f"{args.file} ({os.path.getsize(args.file) / 1e6:.1f} MB on disk)")
+    print(report.to_string(float_format=lambda x: f"{x:,.2f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Latency and throughput of the risk API under concurrent clients.
+
+Usage: python benchmarks/load_test.py [--url URL] [--requests N] [--concurrency C]
+
+Without ``--url`` a local server (``python -m risk_engine.server``) is started
+on a free port for the run. The queries cycle through every alliance mapping
+x risk type x (no area filter, each area); each distinct query is requested
+once first to warm the result cache, unless ``--cold``.
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(data_dir, timeout=300):
+    """Start a local server and return (process, base URL) once it answers /health."""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "risk_engine.server", "--port", str(port), "--data-dir", data_dir],
+        cwd=ROOT,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            status, _ = Client(url).get("/health")
+            if status == 200:
+                return process, url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"server not ready after {timeout}s")
+
+
+class Client:
+    """One keep-alive connection."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=120)
+
+    def get(self, path):
+        try:
+            self.connection.request("GET", path)
+            response = self.connection.getresponse()
+        except (http.client.HTTPException, ConnectionError):
+            # Dropped keep-alive connection: reconnect once
+            self.connection.close()
+            self.connection.request("GET", path)
+            response = self.connection.getresponse()
+        return response.status, response.read()
+
+
+def queries(url):
+    """Every alliance x flag x (no area, each area) /risk path."""
+    client = Client(url)
+    _, body = client.get("/options")
+    options = json.loads(body)
+    paths = []
+    for alliance_type, flag in itertools.product(options["alliances"], options["flags"]):
+        _, body = client.get("/options?" + urlencode({"alliance": alliance_type}))
+        for area in [None] + json.loads(body)["area"]:
+            params = {"alliance": alliance_type, "flag": flag}
+            if area is not None:
+                params["area"] = area
+            paths.append("/risk?" + urlencode(params))
+    return paths
+
+
+def run(url, paths, total, concurrency):
+    """Latencies (seconds) of ``total`` requests over ``concurrency`` connections, errors and wall time."""
+    local = threading.local()
+    latencies = np.empty(total)
+    errors = []
+
+    def request(i):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = Client(url)
+        start = time.perf_counter()
+        status, _ = client.get(paths[i % len(paths)])
+        latencies[i] = time.perf_counter() - start
+        if status != 200:
+            errors.append(status)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(request, range(total)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="server to test (default: start a local one)")
+    parser.add_argument("--data-dir", default=".", help="input workbooks of the local server")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--cold", action="store_true", help="don't warm the result cache first")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_server(os.path.abspath(args.data_dir))
+    try:
+        paths = queries(url)
+        random.Random(args.seed).shuffle(paths)
+        if not args.cold:
+            client = Client(url)
+            for path in paths:
+                client.get(path)
+
+        latencies, errors, elapsed = run(url, paths, args.requests, args.concurrency)
+        ms = latencies * 1000
+        print(f"{args.requests:,} requests over {len(paths)} distinct queries, concurrency {args.concurrency}"
+              f"{' (cold cache)' if args.cold else ''}")
+        print(f"throughput  {args.requests / elapsed:,.0f} req/s")
+        print(f"latency ms  p50 {np.percentile(ms, 50):.2f}  p90 {np.percentile(ms, 90):.2f}  "
+              f"p99 {np.percentile(ms, 99):.2f}  max {ms.max():.2f}")
+        print(f"errors      {len(errors)}")
+        _, body = Client(url).get("/health")
+        print(f"cache       {json.loads(body)['cache']}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
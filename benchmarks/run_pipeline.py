@@ -0,0 +1,162 @@
+"""Time each stage of the risk pipeline on synthetic data.
+
+    python benchmarks/run_pipeline.py --rows 10000 100000 1000000 -o bench.json
+    python benchmarks/run_pipeline.py --rows 100000 --compare bench.json
+
+Stages: load (Excel parse for sizes up to ``--max-xlsx-rows``, dictionary
+encoding always), alliance merge, enrichment, recalculate(), the section 5/6
+aggregations for both risk types and rendering prep (first detail page and
+the aggregates formatted and converted to Arrow, as st.dataframe does).
+Each timing is the best of ``--repeat`` runs. Results are written as JSON;
+``--compare`` prints the ratio to an earlier run.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import generate_inputs, write_workbooks  # noqa: E402
+
+from risk_engine import ALLIANCE_TYPES, aggregate, compute, enrich, load_inputs  # noqa: E402
+from risk_engine import encoding  # noqa: E402
+from risk_engine.columns import CATEGORY  # noqa: E402
+from risk_engine.encoding import encode_inputs  # noqa: E402
+from risk_engine.engine import group_column  # noqa: E402
+from risk_engine.enrich import assign_alliance  # noqa: E402
+from risk_engine.paging import page  # noqa: E402
+
+FORMATS = {"Net Sales": "{:,.0f}", "Risk": "{:,.0f}", "% Risk": "{:.2%}"}
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _render(frames):
+    for frame in frames:
+        frame.style.format({c: f for c, f in FORMATS.items() if c in frame.columns}).to_html()
+        pa.Table.from_pandas(frame)
+
+
+def bench_size(rows, comparables, customers, repeat, max_xlsx_rows):
+    results = []
+
+    def record(stage, seconds, alliance=None, rows_out=None):
+        results.append({
+            "rows": rows, "comparables": comparables, "customers": customers,
+            "alliance": alliance, "stage": stage, "seconds": seconds, "rows_out": rows_out,
+        })
+
+    raw = generate_inputs(rows, comparables, customers, encode=False)
+    if rows <= max_xlsx_rows:
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_workbooks(raw, data_dir)
+            # Fresh cache directory per run so the Excel parse is measured, not the Parquet hit
+            seconds, _ = best_of(1, lambda: load_inputs(data_dir, cache_dir=tempfile.mkdtemp(dir=data_dir), encode=False))
+            record("load (xlsx)", seconds, rows_out=rows)
+    def encode():
+        # Bypass the per-version memo so every repeat does the work
+        encoding._memo.clear()
+        return encode_inputs(raw)
+    seconds, inputs = best_of(repeat, encode)
+    record("load (encode)", seconds, rows_out=rows)
+
+    for alliance_type in ALLIANCE_TYPES:
+        seconds, merged = best_of(repeat, lambda: assign_alliance(inputs, alliance_type))
+        record("alliance merge", seconds, alliance_type, len(merged))
+        seconds, calc = best_of(repeat, lambda: enrich(inputs, alliance_type))
+        record("enrichment", seconds, alliance_type, len(calc))
+        seconds, detail = best_of(repeat, lambda: compute(calc, inputs.corridor_index, {}))
+        record("recalculate", seconds, alliance_type, len(detail))
+
+        def aggregations():
+            views = []
+            for flag in ("suffered", "generated"):
+                group_col = group_column(flag)
+                views += [aggregate(detail, group_col), aggregate(detail, [group_col, CATEGORY])]
+            return views
+        seconds, views = best_of(repeat, aggregations)
+        record("aggregation", seconds, alliance_type, sum(len(v) for v in views))
+
+        seconds, _ = best_of(repeat, lambda: _render([page(detail, 0, 100, "Risk", False)] + views))
+        record("render prep", seconds, alliance_type)
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, previous):
+    keys = ["rows", "comparables", "customers", "alliance", "stage"]
+    new = pd.DataFrame(current["results"]).fillna({"alliance": "-"})
+    old = pd.DataFrame(previous["results"]).fillna({"alliance": "-"})
+    merged = new.merge(old, on=keys, suffixes=("", " (before)"))
+    merged["ratio"] = merged["seconds"] / merged["seconds (before)"]
+    return merged[keys + ["seconds (before)", "seconds", "ratio"]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--comparables", type=int, nargs="+", default=[200])
+    parser.add_argument("--customers", type=int, nargs="+", default=[90])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-xlsx-rows", type=int, default=100_000,
+                        help="largest size for which the Excel parse is timed (default: %(default)s)")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier run to compare against")
+    args = parser.parse_args(argv)
+    warnings.simplefilter("ignore")
+
+    results = []
+    for rows, comparables, customers in itertools.product(args.rows, args.comparables, args.customers):
+        print(f"rows={rows:,} comparables={comparables:,} customers={customers:,}", file=sys.stderr)
+        results += bench_size(rows, comparables, customers, args.repeat, args.max_xlsx_rows)
+
+    report = {
+        "meta": {
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+    frame = pd.DataFrame(results).fillna({"alliance": "-"})
+    print(frame.pivot_table(index=["rows", "comparables", "customers", "stage"], columns="alliance",
+                            values="seconds", sort=False).to_string(float_format=lambda x: f"{x:.4f}"))
+    if args.compare:
+        with open(args.compare) as fh:
+            previous = json.load(fh)
+        print()
+        print(compare(report, previous).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Synthetic inputs with the same shape as the shipped workbooks.
+
+    python benchmarks/synthetic.py --rows 100000 --write-dir /tmp/synthetic
+
+``generate_inputs`` returns an ``Inputs`` ready for the pipeline; with
+``--write-dir`` the six workbooks are also written as .xlsx under their usual
+file names so the app or ``risk-calc --data-dir`` can run on them.
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from risk_engine.columns import COUNTRY, CUSTOMER, NET_PRICE, PRODUCT, VOLUMES  # noqa: E402
+from risk_engine.encoding import encode_inputs  # noqa: E402
+from risk_engine.loader import WORKBOOKS, Inputs  # noqa: E402
+
+CATEGORIES = ["Bakery", "BFY", "Biscuits", "Pralines", "Snacks", "Spreads", "Tablets", "Tic Tac"]
+AREAS = ["Europe", "Americas", "Asia", "Middle East"]
+
+
+def generate_inputs(rows=10_000, comparables=200, customers=90, countries=48, seed=0, encode=True):
+    rng = np.random.default_rng(seed)
+
+    country_names = np.array([f"Country {i:03d}" for i in range(countries)])
+    customer_names = np.array(["Modern Trade"] + [f"Customer {i:05d}" for i in range(customers - 1)])
+    comparable_names = np.array([f"Comparable {i:05d}" for i in range(comparables)])
+    comparable_category = rng.choice(CATEGORIES, size=comparables)
+
+    # 1-4 products per comparable
+    per_comparable = rng.integers(1, 5, size=comparables)
+    product_comparable = np.repeat(np.arange(comparables), per_comparable)
+    product_names = np.array([f"Product {i:06d}" for i in range(len(product_comparable))])
+
+    product_registry = pd.DataFrame({
+        "Product Hierarchy - Category": comparable_category[product_comparable],
+        "Product Hierarchy - Brand": [f"Brand {c % 40:02d}" for c in product_comparable],
+        "Product Hierarchy - Comparable Product": comparable_names[product_comparable],
+        PRODUCT: product_names,
+        "Product Code": product_names,
+        "Weight [kg/pc]": rng.uniform(0.05, 1.0, size=len(product_names)).round(2),
+    })
+
+    # Zipf-like skew: a few customers and products carry most of the rows
+    customer_weights = 1 / np.arange(1, customers + 1)
+    product_weights = 1 / np.arange(1, len(product_names) + 1) ** 0.5
+    product_idx = rng.choice(len(product_names), size=rows, p=product_weights / product_weights.sum())
+    base_price = rng.uniform(5, 40, size=comparables)[product_comparable[product_idx]]
+    country_idx = rng.integers(0, countries, size=rows)
+    price = base_price * rng.uniform(0.7, 1.3, size=countries)[country_idx] * rng.lognormal(0, 0.1, size=rows)
+
+    export = pd.DataFrame({
+        "Sellin Calendar Hierarchy - Fiscal Year": "2024-2025",
+        "Sellin Calendar Hierarchy - Session": rng.choice(["I Session", "II Session"], size=rows),
+        COUNTRY: country_names[country_idx],
+        CUSTOMER: customer_names[rng.choice(customers, size=rows, p=customer_weights / customer_weights.sum())],
+        "Product Hierarchy - Brand": product_registry["Product Hierarchy - Brand"].to_numpy()[product_idx],
+        PRODUCT: product_names[product_idx],
+        VOLUMES: rng.lognormal(6, 1.5, size=rows).round(1),
+        "List Price [EUR/kg]": price * 1.6,
+        "Net Price [EUR/kg]": price * 1.3,
+        "2Net Price [EUR/kg]": price * 1.15,
+        NET_PRICE: price,
+    })
+
+    mapped = customer_names[1:]
+    mapping_ba = pd.DataFrame({
+        "Customer Name": mapped[: len(mapped) // 2],
+        "Alliance": rng.choice(["Agecore", "Epic", "Coopernic"], size=len(mapped) // 2),
+    })
+    mapping_ia = pd.DataFrame({
+        "Customer Name": mapped[len(mapped) // 4: 3 * len(mapped) // 4],
+        "Alliance": rng.choice(["Everest", "Eurelec"], size=3 * len(mapped) // 4 - len(mapped) // 4),
+    })
+
+    grid = pd.MultiIndex.from_product([country_names, CATEGORIES], names=["Country", "Attribute"]).to_frame(index=False)
+    corridors = grid.assign(
+        Column1=grid["Country"] + grid["Attribute"],
+        **{"Corridor Min": 100, "Corridor Max": rng.choice([100, 105, 110, 115], size=len(grid))},
+    )
+    mapping_area = pd.DataFrame({"Area": rng.choice(AREAS, size=countries), "Country": country_names})
+
+    tag = f"synthetic-{rows}-{comparables}-{customers}-{countries}-{seed}"
+    inputs = Inputs(
+        export=export,
+        product_registry=product_registry,
+        mapping_ba=mapping_ba,
+        mapping_ia=mapping_ia,
+        corridors=corridors,
+        mapping_area=mapping_area,
+        versions={name: tag for name in WORKBOOKS},
+    )
+    return encode_inputs(inputs) if encode else inputs
+
+
+def write_workbooks(inputs, directory):
+    """Write ``inputs`` as the six workbooks ``load_inputs`` expects."""
+    os.makedirs(directory, exist_ok=True)
+    for name, (filename, _) in WORKBOOKS.items():
+        getattr(inputs, name).to_excel(os.path.join(directory, filename), index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--comparables", type=int, default=200)
+    parser.add_argument("--customers", type=int, default=90)
+    parser.add_argument("--countries", type=int, default=48)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--write-dir", required=True)
+    args = parser.parse_args(argv)
+
+    inputs = generate_inputs(args.rows, args.comparables, args.customers, args.countries, args.seed, encode=False)
+    write_workbooks(inputs, args.write_dir)
+
+
+if __name__ == "__main__":
+    main()
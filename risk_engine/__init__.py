@@ -0,0 +1,27 @@
+"""Computation behind the Risk Analysis Tool, importable without Streamlit."""
+
+from .cache import RESULT_CACHE, ResultCache, query_key
+from .engine import FLAGS, RiskView, aggregate, compute, evaluate, filter_frame, recalculate
+from .enrich import ALLIANCE_TYPES, enrich, get_calc, prewarm, unmatched_customers
+from .loader import Inputs, load_inputs, read_workbook
+
+__all__ = [
+    "ALLIANCE_TYPES",
+    "FLAGS",
+    "Inputs",
+    "RESULT_CACHE",
+    "ResultCache",
+    "RiskView",
+    "aggregate",
+    "compute",
+    "enrich",
+    "evaluate",
+    "filter_frame",
+    "get_calc",
+    "load_inputs",
+    "prewarm",
+    "query_key",
+    "read_workbook",
+    "recalculate",
+    "unmatched_customers",
+]
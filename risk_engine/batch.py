@@ -0,0 +1,100 @@
+"""Parallel evaluation of the alliance x risk type x area scenario grid.
+
+The enriched frames are written once to Arrow IPC files that every worker
+memory-maps, so the base data is shared through the page cache instead of
+being pickled to each process; only the small dense corridor index is sent
+with each task. Workers only send back the aggregates.
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+
+from .columns import AREA, CATEGORY
+from .engine import FLAGS, evaluate
+from .enrich import ALLIANCE_TYPES, get_calc
+
+# Area value for the scenario without an area filter
+ALL_AREAS = "All"
+
+# Per worker process: path -> frame read from the shared Arrow file
+_frames = {}
+
+
+def _write_arrow(frame, path):
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_arrow(path):
+    frame = _frames.get(path)
+    if frame is None:
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        # Numeric columns stay views on the mapped file
+        frame = _frames[path] = table.to_pandas(split_blocks=True)
+    return frame
+
+
+def scenario_grid(calc_by_alliance, flags=FLAGS, areas=None):
+    """Yield (alliance type, area, flags) tasks; ``areas=None`` means every area plus all of them."""
+    for alliance_type, calc in calc_by_alliance.items():
+        alliance_areas = areas
+        if alliance_areas is None:
+            alliance_areas = [ALL_AREAS] + sorted(calc[AREA].dropna().unique())
+        for area in alliance_areas:
+            yield alliance_type, area, tuple(flags)
+
+
+def _evaluate_task(calc_path, corridors, filter_safe, alliance_type, area, flags):
+    calc = _read_arrow(calc_path)
+    calc.attrs["filter_safe"] = filter_safe
+    filters = {AREA: [] if area == ALL_AREAS else [area]}
+
+    tables = []
+    detail = None
+    for flag in flags:
+        view = evaluate(calc, corridors, filters, flag, detail=detail)
+        detail = view.detail
+        for level, agg in (("country", view.agg), ("country_category", view.agg2)):
+            agg = agg.rename(columns={view.group_col: "Country"})
+            if CATEGORY not in agg.columns:
+                agg.insert(1, CATEGORY, pd.NA)
+            agg.insert(0, "Level", level)
+            agg.insert(0, "Area Filter", area)
+            agg.insert(0, "Risk Type", flag)
+            agg.insert(0, "Alliance Mapping", alliance_type)
+            tables.append(agg.astype({"Country": object, CATEGORY: object}))
+    return tables
+
+
+def run_batch(inputs, alliance_types=ALLIANCE_TYPES, flags=FLAGS, areas=None, workers=None):
+    """Evaluate the scenario grid in a process pool and return one table keyed by scenario."""
+    calc_by_alliance = {a: get_calc(inputs, a) for a in alliance_types}
+
+    with tempfile.TemporaryDirectory(prefix="risk-batch-") as shared_dir:
+        calc_paths = {}
+        for i, (alliance_type, calc) in enumerate(calc_by_alliance.items()):
+            calc_paths[alliance_type] = os.path.join(shared_dir, f"calc-{i}.arrow")
+            _write_arrow(calc, calc_paths[alliance_type])
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _evaluate_task,
+                    calc_paths[alliance_type],
+                    inputs.corridor_index,
+                    calc_by_alliance[alliance_type].attrs.get("filter_safe", []),
+                    alliance_type,
+                    area,
+                    task_flags,
+                )
+                for alliance_type, area, task_flags in scenario_grid(calc_by_alliance, flags, areas)
+            ]
+            tables = [table for future in futures for table in future.result()]
+
+    return pd.concat(tables, ignore_index=True)
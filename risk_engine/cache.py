@@ -0,0 +1,155 @@
+"""Bounded LRU cache of computed views."""
+
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+
+def query_key(version, alliance_type, filters, flag, **options):
+    """Canonical hash of one view: selection order and empty filters don't matter.
+
+    ``options`` are evaluation settings (e.g. ``aggregate_first``); falsy ones
+    are left out so they don't split the cache.
+    """
+    canonical = {
+        "version": [list(v) for v in version],
+        "alliance": alliance_type,
+        "filters": {column: sorted(map(str, values)) for column, values in sorted(filters.items()) if values},
+        "flag": flag,
+    }
+    if any(options.values()):
+        canonical["options"] = {k: v for k, v in sorted(options.items()) if v}
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+
+def _nbytes(value, seen=None):
+    """Approximate bytes held by ``value``, counting every object it reaches once."""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, (bytes, str)):
+        return sys.getsizeof(value)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (np.ndarray, pd.api.extensions.ExtensionArray)):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_nbytes(v, seen) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_nbytes(k, seen) + _nbytes(v, seen) for k, v in value.items())
+    if hasattr(value, "__dict__"):
+        return _nbytes(vars(value), seen)
+    return 0
+
+
+class ResultCache:
+    """Thread-safe LRU cache bounded by entry count and by total frame memory."""
+
+    def __init__(self, max_entries=32, max_bytes=512 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        # key -> Future of the computation in flight
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = _nbytes(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            if size > self.max_bytes:
+                # Would evict everything else and still not fit
+                return
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            self._evict()
+        if hasattr(value, "on_resize"):
+            # Views that build parts lazily (detail, drill-down index) report it
+            value.on_resize = lambda: self.resize(key, value)
+
+    def resize(self, key, value):
+        """Re-measure ``value``, cached under ``key``, after it grew."""
+        size = _nbytes(value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] is not value:
+                return
+            self.nbytes += size - entry[1]
+            self._entries[key] = (value, size)
+            if size > self.max_bytes:
+                del self._entries[key]
+                self.nbytes -= size
+            self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.nbytes -= evicted
+
+    def get_or_compute(self, key, compute):
+        """Cached value of ``key``; concurrent misses on the same key compute it once."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0]
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+
+        if owner:
+            try:
+                value = compute()
+                self.put(key, value)
+                future.set_result(value)
+            except BaseException as exc:
+                future.set_exception(exc)
+            finally:
+                with self._lock:
+                    self._pending.pop(key, None)
+        return future.result()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Shared by every session of the app
+RESULT_CACHE = ResultCache()
@@ -0,0 +1,76 @@
+"""Country bar chart, cached by the content of the aggregate it plots.
+
+Reruns and sessions looking at the same aggregate get the same figure
+object back instead of rebuilding it; a large country axis can be cut to
+the top N countries by Risk plus an "Other" bar.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.graph_objects as go
+
+OTHER = "Other"
+COLORS = {"Net Sales": "steelblue", "Risk": "crimson"}
+
+_lock = threading.Lock()
+# (content hash, group column, top) -> Figure
+_figures = OrderedDict()
+MAX_FIGURES = 32
+
+
+def content_hash(frame):
+    """Hash of the values (not the index) of ``frame``."""
+    hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    return hashlib.sha256(hashes.tobytes() + repr(list(frame.columns)).encode()).hexdigest()
+
+
+def top_n(agg, group_col, n):
+    """The ``n`` rows with the most Risk, and the rest summed into one "Other" row."""
+    if n is None or len(agg) <= n:
+        return agg
+    ranked = agg.sort_values("Risk", ascending=False, kind="stable")
+    head, rest = ranked.iloc[:n], ranked.iloc[n:]
+    other = pd.DataFrame({
+        group_col: [f"{OTHER} ({len(rest)})"],
+        "Net Sales": [rest["Net Sales"].sum()],
+        "Risk": [rest["Risk"].sum()],
+    })
+    result = pd.concat([head.astype({group_col: object}), other], ignore_index=True)
+    if "% Risk" in agg.columns:
+        result["% Risk"] = result["Risk"] / result["Net Sales"]
+    return result
+
+
+def country_bar(agg, group_col, top=None):
+    """Overlaid Net Sales and Risk bars per country; shared, must not be mutated."""
+    data = agg[[group_col, "Net Sales", "Risk"]]
+    key = (content_hash(data), group_col, top)
+    with _lock:
+        figure = _figures.get(key)
+        if figure is not None:
+            _figures.move_to_end(key)
+            return figure
+
+    data = top_n(data, group_col, top)
+    x = data[group_col].astype(object).to_numpy()
+    figure = go.Figure(
+        data=[
+            go.Bar(x=x, y=data[column].to_numpy(), name=column, marker_color=color, opacity=0.8)
+            for column, color in COLORS.items()
+        ],
+        layout=go.Layout(
+            title="Net Sales vs Risk by Country",
+            barmode="overlay",
+            xaxis_title=group_col,
+            yaxis_title="value",
+            legend_title="variable",
+        ),
+    )
+    with _lock:
+        _figures[key] = figure
+        while len(_figures) > MAX_FIGURES:
+            _figures.popitem(last=False)
+    return figure
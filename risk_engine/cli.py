@@ -0,0 +1,142 @@
+"""risk-calc: compute the risk tables without Streamlit.
+
+    python -m risk_engine --alliance all --flag all --area Europe -o out/
+
+Each (alliance, flag) combination writes its detailed, by-country and
+by-country-and-category tables to ``--output-dir``. The inputs are loaded and
+enriched once per alliance mapping and reused across the combinations.
+
+With ``--batch`` the alliance x flag x area grid (every area unless ``--area``
+is given) is evaluated in a process pool and the aggregates of all scenarios
+are written to a single ``scenarios`` table.
+
+With ``--periods`` the Risk trend over every export period (see
+``risk_engine.periods``) is written per alliance mapping and risk type.
+
+``--backend polars`` (or ``RISK_BACKEND=polars``) runs the model as a lazy
+Polars plan instead; with ``--export-parquet`` the Export is scanned from
+Parquet files, e.g. one per year, rather than taken from the workbook.
+
+The issues found by the pre-flight data checks are printed to stderr; with
+``--validation block`` (or ``RISK_VALIDATION=block``) errors, such as joins
+that would multiply export rows or customers mapped to two alliances, stop
+the run before anything is computed.
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+from . import polars_backend, writers
+from .batch import run_batch
+from .columns import ALLIANCE, AREA, CATEGORY, COUNTRY
+from .engine import FLAGS, evaluate
+from .enrich import ALLIANCE_TYPES, get_calc
+from .loader import load_inputs
+from .periods import period_cube, period_trends
+from .validation import POLICIES, validate_inputs
+
+FORMATS = tuple(writers.FORMATS)
+BACKENDS = ("pandas", "polars")
+
+
+def _slug(value):
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")
+
+
+def write_table(frame, path, fmt):
+    writers.write_frame(frame, path, fmt)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="risk-calc", description="Compute the risk tables from the input workbooks.")
+    parser.add_argument("--data-dir", default=".", help="directory holding the input workbooks (default: %(default)s)")
+    parser.add_argument("--cache-dir", help="Parquet cache for parsed workbooks (default: <data-dir>/.cache)")
+    parser.add_argument("--alliance", choices=ALLIANCE_TYPES + ("all",), default="all", help="alliance mapping")
+    parser.add_argument("--flag", choices=FLAGS + ("all",), default="all", help="risk type")
+    parser.add_argument("--area", action="append", default=[], help="keep only this area (repeatable)")
+    parser.add_argument("--country", action="append", default=[], help="keep only this country (repeatable)")
+    parser.add_argument("--category", action="append", default=[], help="keep only this category (repeatable)")
+    parser.add_argument("--alliance-filter", action="append", default=[], metavar="ALLIANCE",
+                        help="keep only this alliance (repeatable)")
+    parser.add_argument("-o", "--output-dir", default="output", help="where to write the tables (default: %(default)s)")
+    parser.add_argument("--format", choices=FORMATS, default="parquet", help="output format (default: %(default)s)")
+    parser.add_argument("--batch", action="store_true", help="evaluate the scenario grid per area in parallel")
+    parser.add_argument("--workers", type=int, help="worker processes for --batch (default: CPU count)")
+    parser.add_argument("--periods", action="store_true", help="write the Risk trend over every export period")
+    parser.add_argument("--backend", choices=BACKENDS, default=os.environ.get("RISK_BACKEND", "pandas"),
+                        help="execution backend (default: $RISK_BACKEND or pandas)")
+    parser.add_argument("--export-parquet", action="append", default=[], metavar="PATH",
+                        help="scan the Export from these Parquet files or globs (polars backend, repeatable)")
+    parser.add_argument("--validation", choices=POLICIES, default=os.environ.get("RISK_VALIDATION", "flag"),
+                        help="report input errors or refuse to run (default: $RISK_VALIDATION or flag)")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.backend not in BACKENDS:
+        parser.error(f"unknown backend {args.backend!r} (from RISK_BACKEND)")
+    if args.backend != "polars" and args.export_parquet:
+        parser.error("--export-parquet needs --backend polars")
+    if args.backend != "pandas" and args.batch:
+        parser.error("--batch runs on the pandas backend only")
+    if args.validation not in POLICIES:
+        parser.error(f"unknown validation policy {args.validation!r} (from RISK_VALIDATION)")
+
+    alliance_types = ALLIANCE_TYPES if args.alliance == "all" else (args.alliance,)
+    flags = FLAGS if args.flag == "all" else (args.flag,)
+    filters = {
+        AREA: args.area,
+        COUNTRY: args.country,
+        CATEGORY: args.category,
+        ALLIANCE: args.alliance_filter,
+    }
+
+    start = time.perf_counter()
+    try:
+        inputs = load_inputs(args.data_dir, args.cache_dir, validation=args.validation)
+    except ValueError as exc:
+        parser.exit(1, f"{parser.prog}: error: {exc}\n")
+    for issue in validate_inputs(inputs).issues.itertuples():
+        print(f"{issue.Severity}: {issue.Workbook}: {issue.Detail}", file=sys.stderr)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    if args.periods:
+        for alliance_type in alliance_types:
+            cube = period_cube(args.data_dir, alliance_type, filters, cache_dir=args.cache_dir)
+            for flag in flags:
+                trends = period_trends(cube, flag)
+                write_table(trends, os.path.join(args.output_dir, f"{_slug(alliance_type)}_{flag}_periods.{args.format}"),
+                            args.format)
+                print(f"{alliance_type} / {flag}: {trends['Period'].nunique()} periods", file=sys.stderr)
+        print(f"done in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+        return 0
+
+    if args.batch:
+        scenarios = run_batch(inputs, alliance_types, flags, areas=args.area or None, workers=args.workers)
+        write_table(scenarios, os.path.join(args.output_dir, f"scenarios.{args.format}"), args.format)
+        print(f"{len(scenarios):,} scenario rows in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+        return 0
+
+    export = polars_backend.scan_export(args.export_parquet) if args.export_parquet else None
+    for alliance_type in alliance_types:
+        calc = get_calc(inputs, alliance_type) if args.backend == "pandas" else None
+        detail = None
+        for flag in flags:
+            if args.backend == "polars":
+                view = polars_backend.evaluate(inputs, alliance_type, filters, flag, export=export)
+            else:
+                view = evaluate(calc, inputs.corridor_index, filters, flag, detail=detail)
+                detail = view.detail
+            stem = os.path.join(args.output_dir, f"{_slug(alliance_type)}_{flag}")
+            for name, frame in (("detail", view.detail), ("by_country", view.agg), ("by_country_category", view.agg2)):
+                write_table(frame, f"{stem}_{name}.{args.format}", args.format)
+            print(f"{alliance_type} / {flag}: {len(view.detail):,} rows, "
+                  f"Risk {view.agg['Risk'].sum():,.0f}", file=sys.stderr)
+
+    print(f"done in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
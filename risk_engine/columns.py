@@ -0,0 +1,22 @@
+"""Column names shared across the pipeline."""
+
+COUNTRY = "Sellin Country Hierarchy - Country"
+CUSTOMER = "Customer Hierarchy - Customer"
+PRODUCT = "Product Hierarchy - Product"
+VOLUMES = "Volumes [q]"
+NET_PRICE = "3Net Price [EUR/kg]"
+
+COMPARABLE = "Comparable"
+CATEGORY = "Category"
+ALLIANCE = "Alliance"
+AREA = "Area"
+# Export snapshot a row comes from, in multi-period frames
+PERIOD = "Period"
+
+SUFFERING_COUNTRY = "Suffering Country"
+SUFFERING_CUSTOMER = "Suffering Customer"
+GENERATING_COUNTRY = "Generating Country"
+GENERATING_CUSTOMER = "Generating Customer"
+
+COMPARABLE_KEYS = [COMPARABLE, COUNTRY, CUSTOMER]
+MIN_PRICE_KEYS = [COMPARABLE, ALLIANCE]
@@ -0,0 +1,62 @@
+"""Dense (country, category) index over Corridors.xlsx."""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import CategoricalDtype
+
+
+class CorridorIndex:
+    """Corridor Min/Max as 2-D arrays addressed by country and category codes.
+
+    Built once per corridors version; lookups are a single fancy-indexing
+    gather with no merge and no copy of the frame being enriched. A
+    (Country, Attribute) key listed more than once takes its first row, so
+    it never multiplies rows; ``risk_engine.validation`` reports it.
+    """
+
+    def __init__(self, corridors, countries=None, categories=None):
+        corridors = corridors.drop_duplicates(["Country", "Attribute"], keep="first")
+        self.countries = _dtype(corridors["Country"], countries)
+        self.categories = _dtype(corridors["Attribute"], categories)
+        country_codes = _codes(corridors["Country"], self.countries)
+        category_codes = _codes(corridors["Attribute"], self.categories)
+        shape = (len(self.countries.categories), len(self.categories.categories))
+
+        self.values = {}
+        self.dtypes = {}
+        for column in ("Corridor Min", "Corridor Max"):
+            grid = np.full(shape, np.nan)
+            known = (country_codes >= 0) & (category_codes >= 0)
+            grid[country_codes[known], category_codes[known]] = corridors[column].to_numpy(dtype=float)[known]
+            self.values[column] = grid
+            self.dtypes[column] = corridors[column].dtype
+
+    def lookup(self, column, countries, categories):
+        """``column`` for each (country, category) pair; NaN where no corridor exists."""
+        country_codes = _codes(countries, self.countries)
+        category_codes = _codes(categories, self.categories)
+        found = (country_codes >= 0) & (category_codes >= 0)
+        result = self.values[column][np.where(found, country_codes, 0), np.where(found, category_codes, 0)]
+        result[~found] = np.nan
+
+        # Keep the source dtype when every row matched, as a left merge would
+        dtype = self.dtypes[column]
+        if dtype.kind in "iu" and not np.isnan(result).any():
+            result = result.astype(dtype)
+        return result
+
+
+def _dtype(values, dtype):
+    if dtype is not None:
+        return dtype
+    if isinstance(values.dtype, CategoricalDtype):
+        return values.dtype
+    return CategoricalDtype(sorted(pd.unique(values.dropna()), key=str))
+
+
+def _codes(values, dtype):
+    if not isinstance(values, pd.Series):
+        values = pd.Series(values)
+    if values.dtype != dtype:
+        values = values.astype(object).astype(dtype)
+    return np.asarray(values.cat.codes, dtype=np.intp)
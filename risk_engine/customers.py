@@ -0,0 +1,94 @@
+"""Normalized customer-key index used by every alliance mapping."""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import CategoricalDtype
+
+MODERN_TRADE = "Modern Trade"
+
+
+def normalize(values):
+    """Customer names as match keys: trimmed, inner whitespace collapsed, casefolded."""
+    return (
+        pd.Series(values).astype("string")
+        .str.strip()
+        .str.replace(r"\s+", " ", regex=True)
+        .str.casefold()
+    )
+
+
+class CustomerIndex:
+    """Alliance of every export row, per mapping, from normalized customer keys.
+
+    Names are normalized once per distinct label (the Customer dictionary
+    when the inputs are encoded), so "ASDA " and "asda" in Export.xlsx both
+    match "ASDA" in a mapping workbook. Each mapping becomes an array of
+    alliance codes addressed by key code; assigning the alliance of a row is
+    a gather with no merge. Where a mapping gives one normalized key two
+    different alliances, its first row wins; ``conflicts`` lists those keys
+    per alliance type (``risk_engine.validation`` reports them).
+    """
+
+    def __init__(self, customers, mappings, alliances=None):
+        if isinstance(customers.dtype, CategoricalDtype):
+            labels = customers.cat.categories
+            label_codes = customers.cat.codes.to_numpy()
+        else:
+            label_codes, labels = pd.factorize(customers)
+        key_of_label, self.keys = pd.factorize(normalize(labels))
+        # Export row -> normalized key code, -1 for a missing customer
+        self.row_keys = np.where(label_codes >= 0, key_of_label[label_codes], -1) if len(labels) else label_codes
+        self.customers = pd.Series(customers).reset_index(drop=True)
+
+        if alliances is None:
+            found = set()
+            for mapping in mappings.values():
+                found.update(pd.unique(mapping["Alliance"].dropna()))
+            alliances = CategoricalDtype(sorted(found | {MODERN_TRADE}, key=str))
+        self.alliances = alliances
+
+        self.codes = {}
+        self.conflicts = {}
+        for alliance_type, mapping in mappings.items():
+            self.codes[alliance_type] = self._mapping_codes(alliance_type, mapping)
+        modern_trade = np.full(len(self.keys), -1, dtype=np.int64)
+        modern_trade[self.keys == normalize([MODERN_TRADE])[0]] = self.alliances.categories.get_loc(MODERN_TRADE)
+        self.codes[MODERN_TRADE] = modern_trade
+
+    def _mapping_codes(self, alliance_type, mapping):
+        mapping = mapping.dropna(subset=["Customer Name", "Alliance"])
+        keys = normalize(mapping["Customer Name"]).to_numpy()
+        alliance_codes = pd.Categorical(mapping["Alliance"], dtype=self.alliances).codes
+
+        pairs = pd.DataFrame({"key": keys, "alliance": alliance_codes}).drop_duplicates()
+        conflicting = pairs["key"].duplicated(keep=False)
+        self.conflicts[alliance_type] = sorted(pd.unique(pairs.loc[conflicting, "key"]))
+        pairs = pairs.drop_duplicates("key", keep="first")
+
+        codes = np.full(len(self.keys), -1, dtype=np.int64)
+        positions = self.keys.get_indexer(pairs["key"])
+        known = positions >= 0
+        codes[positions[known]] = pairs["alliance"].to_numpy()[known]
+        return codes
+
+    def alliance_codes(self, alliance_type):
+        """Alliance code of every export row for ``alliance_type``, -1 where unmapped."""
+        if alliance_type not in self.codes:
+            raise ValueError(f"Unknown alliance type: {alliance_type!r}")
+        codes = self.codes[alliance_type]
+        return np.where(self.row_keys >= 0, codes[self.row_keys], -1) if len(codes) else self.row_keys
+
+    def alliance(self, alliance_type):
+        """The Alliance column of the export for ``alliance_type`` (missing where unmapped)."""
+        return pd.Categorical.from_codes(self.alliance_codes(alliance_type), dtype=self.alliances)
+
+    def unmatched(self, alliance_type, volumes=None):
+        """Export customers with no alliance under ``alliance_type``, largest first."""
+        unmatched = self.alliance_codes(alliance_type) < 0
+        report = pd.DataFrame({"Customer": self.customers.astype(object)[unmatched].to_numpy()})
+        aggregations = {"Rows": ("Customer", "size")}
+        if volumes is not None:
+            report["Volumes"] = np.asarray(volumes)[unmatched]
+            aggregations["Volumes"] = ("Volumes", "sum")
+        report = report.groupby("Customer", dropna=False).agg(**aggregations).reset_index()
+        return report.sort_values(list(aggregations)[::-1], ascending=False, kind="stable", ignore_index=True)
@@ -0,0 +1,96 @@
+"""Inverted index from aggregate cells and min-price groups to detail rows.
+
+For each key set the detail rows are grouped once into CSR form: the row
+positions sorted by group code, and one offset per group. The rows behind an
+aggregate cell or a (Comparable, Alliance) source are then a slice, with no
+filtering of the whole table.
+"""
+
+import numpy as np
+
+from .columns import CATEGORY, GENERATING_COUNTRY, GENERATING_CUSTOMER, MIN_PRICE_KEYS
+from .encoding import group_codes
+from .engine import generating_rows, group_keys
+
+
+class _Groups:
+    """Row positions of ``detail`` per distinct value of ``keys``."""
+
+    def __init__(self, detail, keys):
+        codes, n_groups = group_codes(detail, keys)
+        grouped = codes >= 0
+        self.order = np.argsort(np.where(grouped, codes, n_groups), kind="stable")[:grouped.sum()]
+        self.offsets = np.zeros(n_groups + 1, dtype=np.intp)
+        np.cumsum(np.bincount(codes[grouped], minlength=n_groups), out=self.offsets[1:])
+
+        # Key labels -> group code, from the first row of every group
+        firsts = self.order[self.offsets[:-1]]
+        labels = detail[keys].iloc[firsts].astype(object).itertuples(index=False, name=None)
+        self.lookup = {key: code for code, key in enumerate(labels)}
+
+    def rows(self, key):
+        code = self.lookup.get(key)
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+        return self.order[self.offsets[code]:self.offsets[code + 1]]
+
+
+class DrillIndex:
+    """Contributing and generating rows behind the aggregates of one view.
+
+    Built from the detailed table: ``rows`` serves the by-country table and
+    the by-country-and-category cells, ``source_rows`` the (Comparable,
+    Alliance) min-price groups, and ``generating`` gives every row's
+    generating row.
+    """
+
+    def __init__(self, detail, group_col):
+        self.detail = detail
+        self.group_col = group_col
+        self.source_keys = group_keys(detail, MIN_PRICE_KEYS)
+        self._countries = _Groups(detail, [group_col])
+        self._cells = _Groups(detail, [group_col, CATEGORY])
+        self._sources = _Groups(detail, self.source_keys)
+        self.generating = generating_rows(detail, detail["Comparable Price"].to_numpy(dtype=float))
+
+    def rows(self, country, category=None):
+        """Positions of the detail rows aggregated into a country, or a country x category cell."""
+        if category is None:
+            return self._countries.rows((country,))
+        return self._cells.rows((country, category))
+
+    def contributions(self, country, category=None):
+        """The detail rows behind an aggregate row, largest Risk first."""
+        rows = self.detail.iloc[self.rows(country, category)]
+        return rows.sort_values("Risk", ascending=False, kind="stable")
+
+    def sources(self, country, category=None):
+        """The min-price groups feeding an aggregate row, with their generating transaction."""
+        positions = self.rows(country, category)
+        frame = self.detail.iloc[positions][self.source_keys + ["Net Sales", "Risk"]]
+        frame = frame.astype({k: object for k in self.source_keys}).assign(**{"Generating Row": self.generating[positions]})
+        sources = frame.groupby(self.source_keys, sort=False, dropna=False).agg(**{
+            "Rows": ("Risk", "size"),
+            "Net Sales": ("Net Sales", "sum"),
+            "Risk": ("Risk", "sum"),
+            "Generating Row": ("Generating Row", "first"),
+        }).reset_index()
+
+        generating = sources["Generating Row"].to_numpy()
+        found = generating >= 0
+        for column in ("Min Price", GENERATING_COUNTRY, GENERATING_CUSTOMER):
+            values = self.detail[column].astype(float if column == "Min Price" else object).to_numpy()
+            sources[column] = np.where(found, values[np.where(found, generating, 0)], np.nan if column == "Min Price" else None)
+        return sources.sort_values("Risk", ascending=False, kind="stable", ignore_index=True)
+
+    def source_rows(self, comparable, alliance, period=None):
+        """Positions of every row of a (Comparable, Alliance) min-price group."""
+        key = (comparable, alliance) if period is None else (period, comparable, alliance)
+        return self._sources.rows(key)
+
+    def generating_row(self, comparable, alliance, period=None):
+        """The generating transaction of a (Comparable, Alliance) group, or None."""
+        rows = self.source_rows(comparable, alliance, period)
+        if not len(rows) or self.generating[rows[0]] < 0:
+            return None
+        return self.detail.iloc[self.generating[rows[0]]]
@@ -0,0 +1,116 @@
+"""Dictionary encoding of the dimension columns.
+
+Every dimension is converted to one pandas Categorical dtype shared by all the
+input frames that carry it, so merges and groupbys work on the integer codes
+and the labels are stored once.
+"""
+
+import threading
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import CategoricalDtype
+
+from .columns import COUNTRY, CUSTOMER, PRODUCT
+from .loader import KEEP_VERSIONS
+
+# Dimension -> (input frame, column) pairs that share its dictionary
+DIMENSIONS = {
+    "Country": [("export", COUNTRY), ("mapping_area", "Country"), ("corridors", "Country")],
+    "Customer": [("export", CUSTOMER), ("mapping_ba", "Customer Name"), ("mapping_ia", "Customer Name")],
+    "Product": [("export", PRODUCT), ("product_registry", PRODUCT)],
+    "Brand": [("export", "Product Hierarchy - Brand"), ("product_registry", "Product Hierarchy - Brand")],
+    "Comparable": [("product_registry", "Product Hierarchy - Comparable Product")],
+    "Category": [("product_registry", "Product Hierarchy - Category"), ("corridors", "Attribute")],
+    "Alliance": [("mapping_ba", "Alliance"), ("mapping_ia", "Alliance")],
+    "Area": [("mapping_area", "Area")],
+    "Fiscal Year": [("export", "Sellin Calendar Hierarchy - Fiscal Year")],
+    "Session": [("export", "Sellin Calendar Hierarchy - Session")],
+}
+
+DIMENSION_FRAMES = sorted({frame for sources in DIMENSIONS.values() for frame, _ in sources})
+
+# Labels that are produced by the pipeline rather than read from a workbook
+EXTRA_LABELS = {"Alliance": ["Modern Trade"]}
+
+_lock = threading.Lock()
+# input version -> encoded Inputs
+_memo = {}
+
+
+def build_dimensions(inputs):
+    """Return dimension name -> CategoricalDtype over every label seen in the inputs."""
+    dimensions = {}
+    for name, sources in DIMENSIONS.items():
+        labels = set(EXTRA_LABELS.get(name, []))
+        for frame_name, column in sources:
+            frame = getattr(inputs, frame_name)
+            if column in frame.columns:
+                labels.update(pd.unique(frame[column].dropna()))
+        dimensions[name] = CategoricalDtype(sorted(labels, key=str))
+    return dimensions
+
+
+def encode_inputs(inputs):
+    """Return a copy of ``inputs`` with every dimension column dictionary-encoded."""
+    if inputs.dimensions:
+        return inputs
+
+    with _lock:
+        encoded = _memo.get(inputs.version)
+    if encoded is not None:
+        return encoded
+
+    dimensions = build_dimensions(inputs)
+    with _lock:
+        previous = list(_memo.values())[-1] if _memo else None
+    reusable = set()
+    if previous is not None and previous.dimensions == dimensions:
+        # Same dictionaries: frames whose workbook didn't change are already encoded
+        reusable = {name for name in DIMENSION_FRAMES if previous.versions.get(name) == inputs.versions.get(name)}
+
+    frames = {name: getattr(previous, name) for name in reusable}
+    for name, sources in DIMENSIONS.items():
+        for frame_name, column in sources:
+            if frame_name in reusable:
+                continue
+            frame = frames.get(frame_name, getattr(inputs, frame_name))
+            if column in frame.columns:
+                frames[frame_name] = frame.assign(**{column: frame[column].astype(dimensions[name])})
+
+    encoded = replace(inputs, dimensions=dimensions, **frames)
+    with _lock:
+        _memo[inputs.version] = encoded
+        while len(_memo) > KEEP_VERSIONS:
+            del _memo[next(iter(_memo))]
+    return encoded
+
+
+def cached_frames():
+    """The encoded input frames currently memoized."""
+    with _lock:
+        encoded = list(_memo.values())
+    return [getattr(inputs, name) for inputs in encoded for name in DIMENSION_FRAMES]
+
+
+def key_codes(values):
+    """Integer codes and cardinality of one key column; missing values get -1."""
+    if isinstance(values.dtype, CategoricalDtype):
+        return np.asarray(values.cat.codes, dtype=np.int64), len(values.cat.categories)
+    codes, uniques = pd.factorize(values)
+    return codes.astype(np.int64), len(uniques)
+
+
+def group_codes(df, keys):
+    """Dense group id per row for ``keys``, -1 where any key is missing (like groupby dropna)."""
+    combined = np.zeros(len(df), dtype=np.int64)
+    missing = np.zeros(len(df), dtype=bool)
+    for key in keys:
+        codes, cardinality = key_codes(df[key])
+        missing |= codes < 0
+        combined = combined * max(cardinality, 1) + codes
+
+    codes = np.full(len(df), -1, dtype=np.intp)
+    codes[~missing], uniques = pd.factorize(combined[~missing])
+    return codes, len(uniques)
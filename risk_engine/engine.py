@@ -0,0 +1,360 @@
+"""Risk computation over the enriched, filtered frame."""
+
+import threading
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import take
+
+from .columns import (
+    ALLIANCE,
+    AREA,
+    CATEGORY,
+    COMPARABLE_KEYS,
+    COUNTRY,
+    CUSTOMER,
+    GENERATING_COUNTRY,
+    GENERATING_CUSTOMER,
+    MIN_PRICE_KEYS,
+    NET_PRICE,
+    PERIOD,
+    SUFFERING_COUNTRY,
+    SUFFERING_CUSTOMER,
+    VOLUMES,
+)
+from .corridors import CorridorIndex
+from .encoding import group_codes, key_codes
+
+# Sidebar filter columns
+FILTER_COLUMNS = [AREA, COUNTRY, CATEGORY, ALLIANCE]
+
+COMPUTED_COLUMNS = [
+    "Comparable Volumes",
+    "Weighted Price Sum",
+    "Comparable Price",
+    "Min Price",
+    GENERATING_COUNTRY,
+    GENERATING_CUSTOMER,
+    "Max Corridor",
+    "Min Corridor",
+    "Operating Corridor",
+    "Net Sales",
+    "Min Price Net Sales",
+    "Risk",
+    "% Risk",
+]
+
+
+def _take(values, positions):
+    # Gather by row position; -1 becomes missing, as with an unmatched left merge
+    return take(values, positions, allow_fill=True)
+
+
+def _first_min_positions(prices, codes, n_groups):
+    """Row position of the first minimum price in each group, -1 if none (like idxmin)."""
+    group_min = np.full(n_groups, np.inf)
+    valid = (codes >= 0) & ~np.isnan(prices)
+    np.minimum.at(group_min, codes[valid], prices[valid])
+
+    candidates = np.flatnonzero(valid & (prices == group_min[np.where(codes >= 0, codes, 0)]))
+    first = np.full(n_groups, -1, dtype=np.intp)
+    groups, first_idx = np.unique(codes[candidates], return_index=True)
+    first[groups] = candidates[first_idx]
+    return first
+
+
+def group_keys(df, keys):
+    """``keys``, led by Period when ``df`` stacks several export periods.
+
+    Every comparable and min-price group is then formed within one period,
+    so all periods are computed in the same grouped pass.
+    """
+    return [PERIOD] + keys if PERIOD in df.columns else keys
+
+
+def generating_rows(df, comparable_price):
+    """Position of each row's generating row (first min price of its (Comparable, Alliance) group), -1 if none."""
+    codes, n_groups = group_codes(df, group_keys(df, MIN_PRICE_KEYS))
+    first_min = _first_min_positions(comparable_price, codes, n_groups)
+    return np.where(codes >= 0, first_min[np.where(codes >= 0, codes, 0)], -1)
+
+
+def comparable_aggregates(df):
+    """Comparable Volumes, Weighted Price Sum and Comparable Price for every row of ``df``."""
+    volumes = df[VOLUMES].to_numpy(dtype=float)
+    weighted = df[NET_PRICE].to_numpy(dtype=float) * volumes
+
+    comparable = pd.DataFrame({"Comparable Volumes": volumes, "Weighted Price Sum": weighted})
+    codes, _ = group_codes(df, group_keys(df, COMPARABLE_KEYS))
+    comparable = comparable.groupby(codes, sort=False).transform("sum")
+    # Rows with a missing key belong to no group
+    comparable.loc[codes < 0] = np.nan
+    comparable_volumes = comparable["Comparable Volumes"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        comparable_price = comparable["Weighted Price Sum"].to_numpy() / comparable_volumes
+    return comparable_volumes, weighted, comparable_price
+
+
+def group_constant_columns(df, columns):
+    """The ``columns`` whose value is the same for every row of a comparable group.
+
+    Filtering on such a column keeps or drops whole (Comparable, Country,
+    Customer) groups, so it leaves the comparable aggregates unchanged.
+    """
+    codes, _ = group_codes(df, group_keys(df, COMPARABLE_KEYS))
+    grouped = codes >= 0
+    n_groups = len(np.unique(codes[grouped]))
+    constant = []
+    for column in columns:
+        values, cardinality = key_codes(df[column])
+        pairs = codes[grouped] * (cardinality + 1) + values[grouped] + 1
+        if len(np.unique(pairs)) == n_groups:
+            constant.append(column)
+    return constant
+
+
+def add_comparables(calc):
+    """Attach the filter-independent comparable aggregates to the enriched frame.
+
+    ``attrs["filter_safe"]`` lists the filter columns for which the attached
+    aggregates can be reused by ``recalculate(..., reuse_comparables=True)``.
+    """
+    comparable_volumes, weighted, comparable_price = comparable_aggregates(calc)
+    calc = calc.assign(**{
+        "Comparable Volumes": comparable_volumes,
+        "Weighted Price Sum": weighted,
+        "Comparable Price": comparable_price,
+    })
+    calc.attrs["filter_safe"] = group_constant_columns(calc, FILTER_COLUMNS)
+    return calc
+
+
+def filter_frame(calc, filters):
+    """Keep the rows of ``calc`` matching every non-empty ``{column: values}`` filter."""
+    mask = None
+    for column, values in filters.items():
+        if values:
+            selected = calc[column].isin(values)
+            mask = selected if mask is None else mask & selected
+    return calc if mask is None else calc[mask]
+
+
+def compute_columns(calc, corridors, filters):
+    """Filter the enriched frame and compute the Risk columns, reusing the comparable stage when possible.
+
+    Returns the filtered frame and the computed columns; ``assemble`` joins them.
+    """
+    active = [column for column, values in filters.items() if values]
+    reuse = "Comparable Price" in calc.columns and set(active) <= set(calc.attrs.get("filter_safe", ()))
+    df = filter_frame(calc, filters)
+    return df, risk_columns(df, corridors, reuse_comparables=reuse)
+
+
+def compute(calc, corridors, filters):
+    """Filter the enriched frame and compute the detailed Risk table."""
+    return assemble(*compute_columns(calc, corridors, filters))
+
+
+def recalculate(df, corridors, reuse_comparables=False):
+    """Compute comparable prices, min prices, corridors and Risk for ``df``.
+
+    Every stage works on integer group codes and positional gathers, so the
+    input is never copied or merged; the result has a fresh RangeIndex.
+    ``corridors`` is a CorridorIndex; a Corridors frame is indexed on the fly.
+    With ``reuse_comparables`` the comparable aggregates already attached by
+    ``add_comparables`` are used instead of being recomputed.
+    """
+    return assemble(df, risk_columns(df, corridors, reuse_comparables))
+
+
+def risk_columns(df, corridors, reuse_comparables=False):
+    """The computed columns of ``recalculate`` as arrays aligned with the rows of ``df``."""
+    volumes = df[VOLUMES].to_numpy(dtype=float)
+    if reuse_comparables:
+        comparable_volumes = df["Comparable Volumes"].to_numpy()
+        weighted = df["Weighted Price Sum"].to_numpy()
+        comparable_price = df["Comparable Price"].to_numpy()
+    else:
+        comparable_volumes, weighted, comparable_price = comparable_aggregates(df)
+
+    # Min Price + Generating Country/Customer from the same (Comparable, Alliance) codes
+    generating = generating_rows(df, comparable_price)
+    min_price = _take(comparable_price, generating)
+
+    generating_country = _take(df[COUNTRY].array, generating)
+    generating_customer = _take(df[CUSTOMER].array, generating)
+
+    # Corridors: Max by Suffering Country, Min by Generating Country
+    if not isinstance(corridors, CorridorIndex):
+        corridors = CorridorIndex(corridors)
+    categories = df[CATEGORY].array
+    max_corridor = corridors.lookup("Corridor Max", df[COUNTRY].array, categories)
+    min_corridor = corridors.lookup("Corridor Min", generating_country, categories)
+
+    # Calculations
+    with np.errstate(divide="ignore", invalid="ignore"):
+        operating_corridor = max_corridor / min_corridor
+        net_sales = comparable_price * volumes
+        min_price_net_sales = min_price * volumes
+        risk = np.clip(net_sales - min_price_net_sales * operating_corridor, 0, None)
+        risk[np.isnan(risk)] = 0
+        risk_pct = risk / net_sales
+
+    return {
+        "Comparable Volumes": comparable_volumes,
+        "Weighted Price Sum": weighted,
+        "Comparable Price": comparable_price,
+        "Min Price": min_price,
+        GENERATING_COUNTRY: generating_country,
+        GENERATING_CUSTOMER: generating_customer,
+        "Max Corridor": max_corridor,
+        "Min Corridor": min_corridor,
+        "Operating Corridor": operating_corridor,
+        "Net Sales": net_sales,
+        "Min Price Net Sales": min_price_net_sales,
+        "Risk": risk,
+        "% Risk": risk_pct,
+    }
+
+
+def assemble(df, columns):
+    """Build the detailed table from ``df`` and the arrays returned by ``risk_columns``."""
+    result = {c: df[c].array for c in df.columns if c not in COMPUTED_COLUMNS}
+    result.update(columns)
+
+    # Rename for display
+    df = pd.DataFrame(result, index=pd.RangeIndex(len(df)))
+    return df.rename(columns={COUNTRY: SUFFERING_COUNTRY, CUSTOMER: SUFFERING_CUSTOMER})
+
+
+class RiskView:
+    """Detailed result plus the by-country and by-country-and-category aggregates.
+
+    In aggregate-first mode the aggregates come from ``cube`` and the detailed
+    table is only assembled, once, on first access to ``detail``; ``retained``
+    holds what ``materialize`` keeps alive until then, so it is counted in the
+    view's size. The drill-down index (see ``risk_engine.drilldown``) is
+    likewise built on first access to ``drilldown`` and kept with the view.
+    Either one growing the view calls ``on_resize``, set by the cache holding it.
+    """
+
+    def __init__(self, agg, agg2, group_col, detail=None, materialize=None, cube=None, retained=None):
+        self.agg = agg
+        self.agg2 = agg2
+        self.group_col = group_col
+        self.cube = cube
+        self.on_resize = None
+        self._detail = detail
+        self._materialize = materialize
+        self._retained = retained
+        self._drilldown = None
+        self._lock = threading.Lock()
+
+    def _resized(self):
+        if self.on_resize is not None:
+            self.on_resize()
+
+    @property
+    def detail_ready(self):
+        return self._detail is not None
+
+    @property
+    def detail(self):
+        if self._detail is None:
+            with self._lock:
+                built = self._detail is None
+                if built:
+                    self._detail = self._materialize()
+                    self._materialize = self._retained = None
+            if built:
+                self._resized()
+        return self._detail
+
+    @property
+    def drilldown(self):
+        if self._drilldown is None:
+            from .drilldown import DrillIndex
+            detail = self.detail
+            with self._lock:
+                built = self._drilldown is None
+                if built:
+                    self._drilldown = DrillIndex(detail, self.group_col)
+            if built:
+                self._resized()
+        return self._drilldown
+
+
+# Risk types: risk a country suffers, or generates through its min prices
+FLAGS = ("suffered", "generated")
+
+
+def group_column(flag):
+    if flag == "suffered":
+        return SUFFERING_COUNTRY
+    if flag == "generated":
+        return GENERATING_COUNTRY
+    raise ValueError(f"Unknown risk type: {flag!r}")
+
+
+def aggregate(df, keys):
+    agg = df.groupby(keys, observed=True).agg({
+        "Net Sales": "sum",
+        "Risk": "sum"
+    }).reset_index()
+    agg["% Risk"] = agg["Risk"] / agg["Net Sales"]
+    return agg
+
+
+def evaluate(calc, corridors, filters, flag, detail=None, aggregate_first=False):
+    """Filter, recalculate and aggregate one view of the enriched frame.
+
+    The detail does not depend on ``flag``; pass the one computed for the
+    other risk type as ``detail`` to only redo the aggregation. With
+    ``aggregate_first`` the aggregates are answered from a cube and the
+    detailed table is built lazily (see ``RiskView``).
+    """
+    group_col = group_column(flag)
+    if aggregate_first and detail is None:
+        df, columns = compute_columns(calc, corridors, filters)
+        cube = build_cube(df, columns)
+        return RiskView(
+            agg=aggregate(cube, group_col),
+            agg2=aggregate(cube, [group_col, CATEGORY]),
+            group_col=group_col,
+            materialize=lambda: assemble(df, columns),
+            cube=cube,
+            # Unfiltered, df is calc itself, already held by the enrichment memo
+            retained=(columns,) if df is calc else (df, columns),
+        )
+    if detail is None:
+        detail = compute(calc, corridors, filters)
+    return RiskView(
+        detail=detail,
+        agg=aggregate(detail, group_col),
+        agg2=aggregate(detail, [group_col, CATEGORY]),
+        group_col=group_col,
+    )
+
+
+# Dimensions of the aggregate cube; both aggregate tables are roll-ups of it
+CUBE_KEYS = [SUFFERING_COUNTRY, GENERATING_COUNTRY, CATEGORY, AREA, ALLIANCE]
+
+
+def build_cube(df, columns):
+    """Net Sales and Risk summed by ``CUBE_KEYS`` (and Period) from ``risk_columns`` output.
+
+    Missing keys are kept as their own cells so roll-ups match aggregating
+    the detailed table.
+    """
+    keys = group_keys(df, CUBE_KEYS)
+    frame = pd.DataFrame({
+        **({PERIOD: df[PERIOD].array} if PERIOD in df.columns else {}),
+        SUFFERING_COUNTRY: df[COUNTRY].array,
+        GENERATING_COUNTRY: columns[GENERATING_COUNTRY],
+        CATEGORY: df[CATEGORY].array,
+        AREA: df[AREA].array,
+        ALLIANCE: df[ALLIANCE].array,
+        "Net Sales": columns["Net Sales"],
+        "Risk": columns["Risk"],
+    })
+    return frame.groupby(keys, observed=True, dropna=False, sort=False)[["Net Sales", "Risk"]].sum().reset_index()
@@ -0,0 +1,127 @@
+"""Enrichment of the export with alliance, comparable, category and area.
+
+The fully joined frame only depends on the input workbooks (other than
+Corridors) and the alliance mapping, so it is built once per (enrichment
+version, alliance type) and shared.
+"""
+
+import threading
+from concurrent.futures import Future
+
+import pandas as pd
+
+from .engine import add_comparables
+from .loader import KEEP_VERSIONS
+
+ALLIANCE_TYPES = ("Buying Alliance", "International Alliance", "Modern Trade")
+
+_lock = threading.Lock()
+# (enrichment version, alliance type) -> Future resolving to the enriched frame
+_memo = {}
+
+
+def assign_alliance(inputs, alliance_type):
+    """Export rows that have an alliance under ``alliance_type``, with an Alliance column.
+
+    Customers are matched on normalized keys through ``inputs.customer_index``
+    (see ``unmatched_customers`` for the rows this drops).
+    """
+    if alliance_type not in ALLIANCE_TYPES:
+        raise ValueError(f"Unknown alliance type: {alliance_type!r}")
+    alliance = inputs.customer_index.alliance(alliance_type)
+    if not inputs.dimensions:
+        alliance = alliance.astype(object)
+
+    # Exclude rows with NaN in Alliance by default
+    keep = pd.notna(alliance)
+    return inputs.export[keep].assign(Alliance=alliance[keep])
+
+
+def unmatched_customers(inputs, alliance_type):
+    """Export customers that ``alliance_type`` maps to no alliance, with rows and volumes."""
+    return inputs.customer_index.unmatched(alliance_type, inputs.export["Volumes [q]"])
+
+
+def enrich(inputs, alliance_type):
+    """Build the joined ``calc`` frame for one alliance mapping.
+
+    The comparable aggregates, which no sidebar filter changes, are attached
+    here so filter interaction only reruns the min-price and Risk stages.
+    """
+    product_registry = inputs.product_registry
+    calc = assign_alliance(inputs, alliance_type)
+
+    # Comparable
+    calc = calc.merge(
+        product_registry[["Product Hierarchy - Product", "Product Hierarchy - Comparable Product"]],
+        how="left",
+        on="Product Hierarchy - Product"
+    ).rename(columns={"Product Hierarchy - Comparable Product": "Comparable"})
+
+    # Category
+    comp_to_cat = product_registry[[
+        "Product Hierarchy - Comparable Product", "Product Hierarchy - Category"
+    ]].drop_duplicates().rename(columns={
+        "Product Hierarchy - Comparable Product": "Comparable",
+        "Product Hierarchy - Category": "Category"
+    })
+    calc = calc.merge(comp_to_cat, how="left", on="Comparable")
+
+    # Mapping Area
+    calc = calc.merge(
+        inputs.mapping_area.rename(columns={"Country": "Sellin Country Hierarchy - Country"}),
+        how="left",
+        on="Sellin Country Hierarchy - Country"
+    )
+    return add_comparables(calc)
+
+
+def get_calc(inputs, alliance_type):
+    """Return the memoized enriched frame; it is shared and must not be mutated."""
+    version = inputs.enrichment_version
+    key = (version, alliance_type)
+    with _lock:
+        future = _memo.get(key)
+        owner = future is None
+        if owner:
+            future = _memo[key] = Future()
+            # Drop the oldest versions; dicts keep insertion order
+            versions = list(dict.fromkeys(k[0] for k in _memo))
+            for stale in [k for k in _memo if k[0] in versions[:-KEEP_VERSIONS]]:
+                del _memo[stale]
+
+    if owner:
+        try:
+            future.set_result(enrich(inputs, alliance_type))
+        except BaseException as exc:
+            with _lock:
+                _memo.pop(key, None)
+            future.set_exception(exc)
+    return future.result()
+
+
+def prewarm(inputs, alliance_types=ALLIANCE_TYPES):
+    """Build the missing alliance variants in a background thread."""
+    with _lock:
+        missing = [a for a in alliance_types if (inputs.enrichment_version, a) not in _memo]
+    if not missing:
+        return None
+
+    def build():
+        for alliance_type in missing:
+            try:
+                get_calc(inputs, alliance_type)
+            except Exception:
+                # Surfaced again to whichever session requests this variant
+                pass
+
+    thread = threading.Thread(target=build, name="risk-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def cached_frames():
+    """The enriched frames currently memoized."""
+    with _lock:
+        futures = list(_memo.values())
+    return [f.result() for f in futures if f.done() and f.exception() is None]
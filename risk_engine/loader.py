@@ -0,0 +1,194 @@
+"""Cached ingestion of the Excel inputs.
+
+Each workbook is parsed with openpyxl at most once per content version: the
+parsed frame is persisted as Parquet under the cache directory (keyed by the
+file's content hash and read options) and kept in a process-wide cache keyed
+by path + mtime, so Streamlit reruns and concurrent sessions reuse it until the
+source file changes.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from functools import cached_property
+
+import pandas as pd
+
+CACHE_DIR = os.environ.get("RISK_CACHE_DIR", ".cache")
+
+# Read options for each input, shared by every consumer of the workbooks
+WORKBOOKS = {
+    "export": ("Export.xlsx", {}),
+    "product_registry": ("Product Registry.xlsx", {}),
+    "mapping_ba": ("Mapping BA.xlsx", {"usecols": [0, 1], "names": ["Customer Name", "Alliance"], "header": 0}),
+    "mapping_ia": ("Mapping IA.xlsx", {"usecols": [0, 1], "names": ["Customer Name", "Alliance"], "header": 0}),
+    "corridors": ("Corridors.xlsx", {}),
+    "mapping_area": ("Mapping Area.xlsx", {}),
+}
+
+# Workbooks the enriched frame is built from; a Corridors change doesn't rebuild it
+ENRICHMENT_INPUTS = ("export", "product_registry", "mapping_ba", "mapping_ia", "mapping_area")
+
+# Versions kept by the derived caches, so sessions still on the previous
+# version keep hitting while a new one is swapped in
+KEEP_VERSIONS = 2
+
+_lock = threading.Lock()
+# (abspath, read options) -> (stat signature, content hash, frame)
+_memory = {}
+
+
+@dataclass(frozen=True)
+class Inputs:
+    export: pd.DataFrame
+    product_registry: pd.DataFrame
+    mapping_ba: pd.DataFrame
+    mapping_ia: pd.DataFrame
+    corridors: pd.DataFrame
+    mapping_area: pd.DataFrame
+    # name -> content hash of the source workbook
+    versions: dict
+    # dimension -> shared CategoricalDtype, set once the inputs are encoded
+    dimensions: dict = None
+
+    @cached_property
+    def corridor_index(self):
+        """Dense corridor lookup over the shared Country/Category dictionaries."""
+        from .corridors import CorridorIndex
+        dimensions = self.dimensions or {}
+        return CorridorIndex(self.corridors, dimensions.get("Country"), dimensions.get("Category"))
+
+    @cached_property
+    def customer_index(self):
+        """Normalized customer keys of the export and the alliance each mapping gives them."""
+        from .customers import CustomerIndex
+        mappings = {"Buying Alliance": self.mapping_ba, "International Alliance": self.mapping_ia}
+        alliances = (self.dimensions or {}).get("Alliance")
+        return CustomerIndex(self.export["Customer Hierarchy - Customer"], mappings, alliances)
+
+    @property
+    def version(self):
+        return tuple(sorted(self.versions.items())) + (("encoded", bool(self.dimensions)),)
+
+    @property
+    def enrichment_version(self):
+        """Version of the inputs the enriched frame depends on (everything but Corridors)."""
+        return tuple(sorted((k, v) for k, v in self.versions.items() if k in ENRICHMENT_INPUTS)) + (
+            ("encoded", bool(self.dimensions)),
+        )
+
+
+def _content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_path(path, content_hash, options, cache_dir):
+    key = hashlib.sha256(f"{content_hash}|{options}".encode()).hexdigest()[:20]
+    stem = os.path.splitext(os.path.basename(path))[0].replace(" ", "_")
+    return os.path.join(cache_dir, f"{stem}-{key}.parquet")
+
+
+def _reader_options(reader, kwargs):
+    return json.dumps({"reader": f"{reader.__module__}.{reader.__qualname__}", **kwargs}, sort_keys=True, default=str)
+
+
+def _read_cached(path, content_hash, kwargs, cache_dir, reader):
+    cache_file = _cache_path(path, content_hash, _reader_options(reader, kwargs), cache_dir)
+    if os.path.exists(cache_file):
+        try:
+            return pd.read_parquet(cache_file)
+        except Exception:
+            # Corrupt or unreadable cache entry: fall through and re-parse
+            pass
+
+    frame = reader(path, **kwargs)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        frame.to_parquet(tmp_file, index=False)
+        os.replace(tmp_file, cache_file)
+    except Exception:
+        # No Parquet engine or mixed-type columns: keep the in-memory copy only
+        pass
+    return frame
+
+
+def read_workbook(path, cache_dir=None, reader=pd.read_excel, **kwargs):
+    """Return ``reader(path, **kwargs)``, parsing the file only when it changed.
+
+    The returned frame is shared between callers and must be treated as read-only.
+    """
+    frame, _ = _read_workbook(path, cache_dir, kwargs, reader)
+    return frame
+
+
+def _read_workbook(path, cache_dir, kwargs, reader=pd.read_excel):
+    path = os.path.abspath(path)
+    cache_dir = cache_dir or os.path.join(os.path.dirname(path), CACHE_DIR)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    key = (path, _reader_options(reader, kwargs))
+
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[2], entry[1]
+
+        content_hash = _content_hash(path)
+        if entry is not None and entry[1] == content_hash:
+            # Touched but unchanged
+            frame = entry[2]
+        else:
+            frame = _read_cached(path, content_hash, kwargs, cache_dir, reader)
+        _memory[key] = (signature, content_hash, frame)
+        return frame, content_hash
+
+
+def cached_frames():
+    """The parsed workbooks currently held in memory."""
+    with _lock:
+        return [entry[2] for entry in _memory.values()]
+
+
+def load_inputs(base_dir=".", cache_dir=None, encode=True, streaming=None, validation=None):
+    """Load the six input workbooks from ``base_dir``.
+
+    With ``encode`` the dimension columns are converted to shared Categoricals
+    (see ``risk_engine.encoding``). With ``streaming`` the Export is read by
+    ``read_export_streaming``, keeping only the columns the model uses; it
+    defaults to the ``RISK_STREAMING_EXPORT`` environment variable.
+
+    The inputs go through the pre-flight checks of ``risk_engine.validation``
+    first; ``validation`` ("flag" or "block") defaults to ``RISK_VALIDATION``.
+    """
+    if streaming is None:
+        streaming = os.environ.get("RISK_STREAMING_EXPORT", "").lower() in ("1", "true", "yes")
+
+    frames = {}
+    versions = {}
+    for name, (filename, kwargs) in WORKBOOKS.items():
+        reader = pd.read_excel
+        if name == "export" and streaming:
+            from .streaming import read_export_streaming
+            reader = read_export_streaming
+        frames[name], versions[name] = _read_workbook(os.path.join(base_dir, filename), cache_dir, kwargs, reader)
+        if reader is not pd.read_excel:
+            # Same file, different frame: keep the derived caches apart
+            versions[name] += f":{reader.__name__}"
+    inputs = Inputs(versions=versions, **frames)
+    if encode:
+        from .encoding import encode_inputs
+        inputs = encode_inputs(inputs)
+    from .validation import preflight
+    preflight(inputs, validation)
+    # Build and validate the lookup indexes up front rather than on first use
+    inputs.corridor_index
+    inputs.customer_index
+    return inputs
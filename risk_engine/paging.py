@@ -0,0 +1,29 @@
+"""Server-side sorting, column selection and paging of result frames."""
+
+import math
+
+import numpy as np
+
+
+def page_count(n_rows, page_size):
+    return max(1, math.ceil(n_rows / page_size))
+
+
+def sort_positions(df, sort_by=None, ascending=True):
+    """Row positions of ``df`` in display order; missing values always last."""
+    if sort_by is None:
+        return np.arange(len(df))
+    values = df[sort_by].reset_index(drop=True)
+    return values.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+
+
+def page(df, number, page_size, sort_by=None, ascending=True, columns=None):
+    """Return rows ``[number * page_size, (number + 1) * page_size)`` of the sorted view.
+
+    Only the requested page is materialized; ``number`` is 0-based and clamped
+    to the last page.
+    """
+    number = min(max(number, 0), page_count(len(df), page_size) - 1)
+    positions = sort_positions(df, sort_by, ascending)[number * page_size:(number + 1) * page_size]
+    view = df if columns is None else df[list(columns)]
+    return view.iloc[positions]
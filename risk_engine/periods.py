@@ -0,0 +1,160 @@
+"""Multi-period Risk over several export snapshots.
+
+``periods.json`` in the data directory maps period labels to export
+workbooks, oldest first:
+
+    {"2025-08": "Export old.xlsx", "2025-09": "Export.xlsx"}
+
+Without it, "Export old.xlsx" and "Export.xlsx" are the periods "previous"
+and "current". The exports are stacked with a Period column and evaluated in
+one grouped pass: Period leads every comparable and min-price group key
+(see ``engine.group_keys``). The reference workbooks are the current ones.
+
+Each period's cube is written to an append-only Parquet store partitioned
+by alliance, filters and period. A file is named after the version of the
+export and reference workbooks it was computed from, so a new month computes
+only that month, and a changed input adds a new file next to the old one.
+"""
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import replace
+
+import pandas as pd
+
+from .cache import query_key
+from .columns import PERIOD
+from .encoding import encode_inputs
+from .engine import build_cube, compute_columns, group_column
+from .enrich import enrich
+from .loader import CACHE_DIR, WORKBOOKS, _read_workbook, load_inputs
+
+PERIODS_FILE = "periods.json"
+DEFAULT_PERIODS = {"previous": "Export old.xlsx", "current": "Export.xlsx"}
+
+
+def period_files(base_dir="."):
+    """Period label -> export workbook path, oldest period first."""
+    manifest = os.path.join(base_dir, PERIODS_FILE)
+    if os.path.exists(manifest):
+        with open(manifest) as fh:
+            periods = json.load(fh)
+        missing = [f for f in periods.values() if not os.path.exists(os.path.join(base_dir, f))]
+        if missing:
+            raise ValueError(f"{PERIODS_FILE} lists missing exports: {', '.join(missing)}")
+    else:
+        periods = {p: f for p, f in DEFAULT_PERIODS.items() if os.path.exists(os.path.join(base_dir, f))}
+    return {period: os.path.join(base_dir, filename) for period, filename in periods.items()}
+
+
+def _safe(label):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", str(label))
+
+
+class PeriodStore:
+    """Per-period cubes under ``root/alliance=.../filters=.../period=.../<version>.parquet``."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, alliance_type, filters, period, version):
+        filters_key = query_key((), alliance_type, filters, None)[:16]
+        return os.path.join(
+            self.root, f"alliance={_safe(alliance_type)}", f"filters={filters_key}", f"period={_safe(period)}",
+            f"{version}.parquet",
+        )
+
+    def get(self, alliance_type, filters, period, version):
+        path = self.path(alliance_type, filters, period, version)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception:
+            # Unreadable partition file: recompute it
+            return None
+
+    def put(self, alliance_type, filters, period, version, cube):
+        path = self.path(alliance_type, filters, period, version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        cube.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+
+def _version(export_hash, reference):
+    references = sorted((k, v) for k, v in reference.versions.items() if k != "export")
+    return hashlib.sha256(json.dumps([export_hash, references]).encode()).hexdigest()[:20]
+
+
+def stack_exports(exports):
+    """One export frame from ``{period: frame}``, with an ordered Period column."""
+    dtype = pd.CategoricalDtype(list(exports), ordered=True)
+    frames = [frame.assign(**{PERIOD: pd.Categorical([period] * len(frame), dtype=dtype)})
+              for period, frame in exports.items()]
+    return pd.concat(frames, ignore_index=True)
+
+
+def compute_periods(reference, exports, alliance_type, filters):
+    """Cube (see ``engine.build_cube``) of every period in ``{period: (frame, content hash)}``.
+
+    ``reference`` supplies the other workbooks (unencoded inputs); all the
+    periods go through enrichment and the Risk computation together.
+    """
+    stacked = stack_exports({period: frame for period, (frame, _) in exports.items()})
+    export_version = "+".join(f"{period}:{content_hash}" for period, (_, content_hash) in exports.items())
+    inputs = encode_inputs(replace(reference, export=stacked, versions={**reference.versions, "export": export_version}))
+    calc = enrich(inputs, alliance_type)
+    return build_cube(*compute_columns(calc, inputs.corridor_index, filters))
+
+
+def period_cube(base_dir, alliance_type, filters, store=None, cache_dir=None):
+    """The cube of every period in ``base_dir``, computing only the periods not in the store yet."""
+    files = period_files(base_dir)
+    if not files:
+        raise ValueError(f"No export periods found in {base_dir!r}")
+    store = store or PeriodStore(os.path.join(cache_dir or os.path.join(base_dir, CACHE_DIR), "periods"))
+    reference = load_inputs(base_dir, cache_dir, encode=False)
+
+    cubes, missing, versions = {}, {}, {}
+    for period, path in files.items():
+        frame, content_hash = _read_workbook(path, cache_dir, WORKBOOKS["export"][1])
+        versions[period] = _version(content_hash, reference)
+        cube = store.get(alliance_type, filters, period, versions[period])
+        if cube is None:
+            missing[period] = (frame, content_hash)
+        else:
+            cubes[period] = cube
+
+    if missing:
+        computed = compute_periods(reference, missing, alliance_type, filters)
+        for period in missing:
+            # Stored even when empty, so a period the filters exclude isn't recomputed
+            cube = computed[computed[PERIOD] == period].reset_index(drop=True).astype({PERIOD: str})
+            store.put(alliance_type, filters, period, versions[period], cube)
+            cubes[period] = cube
+
+    # Labels as plain text: each partition was encoded with its own dictionaries
+    cube = pd.concat([cubes[p] for p in files], ignore_index=True)
+    cube = cube.astype({c: object for c in cube.columns if isinstance(cube[c].dtype, pd.CategoricalDtype)})
+    cube[PERIOD] = pd.Categorical(cube[PERIOD].astype(str), categories=list(files), ordered=True)
+    return cube
+
+
+def period_totals(trends):
+    """Net Sales, Risk and % Risk per period from ``period_trends``, with the change from the previous period."""
+    totals = trends.groupby(PERIOD, observed=False)[["Net Sales", "Risk"]].sum().reset_index()
+    totals["% Risk"] = totals["Risk"] / totals["Net Sales"]
+    totals["Delta Risk"] = totals["Risk"].diff()
+    return totals
+
+
+def period_trends(cube, flag):
+    """Risk per country of ``flag`` and period, with the change from the previous period."""
+    group_col = group_column(flag)
+    trends = cube.groupby([group_col, PERIOD], observed=False)[["Net Sales", "Risk"]].sum().reset_index()
+    trends["% Risk"] = trends["Risk"] / trends["Net Sales"]
+    trends["Delta Risk"] = trends.groupby(group_col, observed=True)["Risk"].diff()
+    return trends
@@ -0,0 +1,193 @@
+"""Lazy Polars execution of the risk model.
+
+The same steps as the pandas engine (alliance mapping, comparable and area
+enrichment, comparable prices, min price and generating row, both corridor
+lookups and the Risk formula) expressed as one Polars LazyFrame plan. The
+Export can be given as a LazyFrame scanning Parquet files, so multi-year
+exports are processed by the streaming engine without first loading them
+into pandas.
+
+Polars is optional: install it to use ``--backend polars``.
+"""
+
+from .columns import (
+    ALLIANCE,
+    CATEGORY,
+    COMPARABLE,
+    COMPARABLE_KEYS,
+    COUNTRY,
+    CUSTOMER,
+    GENERATING_COUNTRY,
+    GENERATING_CUSTOMER,
+    MIN_PRICE_KEYS,
+    NET_PRICE,
+    PERIOD,
+    PRODUCT,
+    SUFFERING_COUNTRY,
+    SUFFERING_CUSTOMER,
+    VOLUMES,
+)
+from .customers import MODERN_TRADE, normalize
+from .engine import COMPUTED_COLUMNS, RiskView, group_column
+
+try:
+    import polars as pl
+except ImportError:  # pragma: no cover - optional dependency
+    pl = None
+
+
+def _require_polars():
+    if pl is None:
+        raise ImportError("The polars backend needs the 'polars' package (pip install polars)")
+
+
+def _lazy(frame):
+    """pandas -> LazyFrame with text dimensions as plain strings."""
+    return pl.from_pandas(frame).lazy().with_columns(pl.col(pl.Categorical).cast(pl.String))
+
+
+def _normalize_batch(names):
+    """``customers.normalize`` of each distinct name in the batch (Polars has no casefold)."""
+    distinct = names.unique().drop_nulls()
+    keys = pl.Series(normalize(distinct.to_list()).to_list(), dtype=pl.String)
+    return names.replace_strict(distinct, keys, default=None, return_dtype=pl.String)
+
+
+def _customer_key(name):
+    return name.cast(pl.String).map_batches(_normalize_batch, return_dtype=pl.String)
+
+
+def scan_export(paths):
+    """LazyFrame over one or more Export Parquet files (e.g. one per year)."""
+    _require_polars()
+    return pl.scan_parquet(paths)
+
+
+def enriched_plan(inputs, alliance_type, export=None):
+    """The enrichment of ``export`` (default ``inputs.export``) as a lazy plan."""
+    _require_polars()
+    export = _lazy(inputs.export) if export is None else export
+    registry = _lazy(inputs.product_registry)
+
+    # Customers match on normalized keys, as with customers.CustomerIndex: the
+    # same normalize(), and the first row of a key mapped to two alliances
+    export = export.with_columns(_customer_key(pl.col(CUSTOMER)).alias("_customer_key"))
+    if alliance_type in ("Buying Alliance", "International Alliance"):
+        mapping = inputs.mapping_ba if alliance_type == "Buying Alliance" else inputs.mapping_ia
+        mapping = _lazy(mapping).select(
+            _customer_key(pl.col("Customer Name")).alias("_customer_key"), ALLIANCE
+        ).drop_nulls().unique("_customer_key", keep="first", maintain_order=True)
+        calc = export.join(mapping, on="_customer_key", how="left", maintain_order="left")
+    elif alliance_type == MODERN_TRADE:
+        is_modern_trade = pl.col("_customer_key") == normalize([MODERN_TRADE])[0]
+        calc = export.with_columns(pl.when(is_modern_trade).then(pl.lit(MODERN_TRADE)).otherwise(None).alias(ALLIANCE))
+    else:
+        raise ValueError(f"Unknown alliance type: {alliance_type!r}")
+    calc = calc.drop("_customer_key")
+    calc = calc.filter(pl.col(ALLIANCE).is_not_null())
+
+    calc = calc.join(
+        registry.select(PRODUCT, pl.col("Product Hierarchy - Comparable Product").alias(COMPARABLE)),
+        on=PRODUCT, how="left", maintain_order="left",
+    )
+    comp_to_cat = registry.select(
+        pl.col("Product Hierarchy - Comparable Product").alias(COMPARABLE),
+        pl.col("Product Hierarchy - Category").alias(CATEGORY),
+    ).unique(maintain_order=True)
+    calc = calc.join(comp_to_cat, on=COMPARABLE, how="left", maintain_order="left")
+    return calc.join(
+        _lazy(inputs.mapping_area).rename({"Country": COUNTRY}), on=COUNTRY, how="left", maintain_order="left"
+    )
+
+
+def risk_plan(calc, corridors, filters):
+    """Filtered detail plan with the ``recalculate`` columns, names and order."""
+    _require_polars()
+    for column, values in filters.items():
+        if values:
+            calc = calc.filter(pl.col(column).is_in([str(v) for v in values]))
+
+    def grouped(expr, keys):
+        # Rows with a missing key belong to no group, as with pandas groupby
+        has_keys = pl.all_horizontal([pl.col(k).is_not_null() for k in keys])
+        return pl.when(has_keys).then(expr.over(keys)).otherwise(None)
+
+    # A Period column (stacked export periods) splits every group, as in the pandas engine
+    period = [PERIOD] if PERIOD in calc.collect_schema().names() else []
+    comparable_keys, min_price_keys = period + COMPARABLE_KEYS, period + MIN_PRICE_KEYS
+
+    volumes = pl.col(VOLUMES).cast(pl.Float64)
+    weighted = pl.col(NET_PRICE).cast(pl.Float64) * volumes
+    plan = calc.with_columns(
+        grouped(volumes.sum(), comparable_keys).alias("Comparable Volumes"),
+        weighted.alias("Weighted Price Sum"),
+        grouped(weighted.sum(), comparable_keys).alias("_weighted_sum"),
+    ).with_columns(
+        (pl.col("_weighted_sum") / pl.col("Comparable Volumes")).fill_nan(None).alias("Comparable Price"),
+    ).with_columns(
+        grouped(pl.col("Comparable Price").min(), min_price_keys).alias("Min Price"),
+    )
+
+    # Generating Country/Customer: first row holding the group's min price
+    is_min = pl.col("Comparable Price") == pl.col("Min Price")
+    plan = plan.with_columns(
+        grouped(pl.col(COUNTRY).filter(is_min).first(), min_price_keys).alias(GENERATING_COUNTRY),
+        grouped(pl.col(CUSTOMER).filter(is_min).first(), min_price_keys).alias(GENERATING_CUSTOMER),
+    )
+
+    # Corridors: Max by Suffering Country, Min by Generating Country
+    # First row of a repeated (Country, Attribute) key, as CorridorIndex
+    lookup = _lazy(corridors[["Country", "Attribute", "Corridor Min", "Corridor Max"]]).unique(
+        ["Country", "Attribute"], keep="first", maintain_order=True
+    )
+    plan = plan.join(
+        lookup.select("Country", "Attribute", pl.col("Corridor Max").alias("Max Corridor")),
+        left_on=[COUNTRY, CATEGORY], right_on=["Country", "Attribute"], how="left", maintain_order="left",
+    ).join(
+        lookup.select("Country", "Attribute", pl.col("Corridor Min").alias("Min Corridor")),
+        left_on=[GENERATING_COUNTRY, CATEGORY], right_on=["Country", "Attribute"], how="left", maintain_order="left",
+    )
+
+    # Calculations
+    net_sales = pl.col("Comparable Price") * volumes
+    min_price_net_sales = pl.col("Min Price") * volumes
+    operating_corridor = pl.col("Max Corridor").cast(pl.Float64) / pl.col("Min Corridor").cast(pl.Float64)
+    risk = (net_sales - min_price_net_sales * operating_corridor).clip(lower_bound=0).fill_nan(0).fill_null(0)
+    plan = plan.with_columns(
+        operating_corridor.alias("Operating Corridor"),
+        net_sales.alias("Net Sales"),
+        min_price_net_sales.alias("Min Price Net Sales"),
+        risk.alias("Risk"),
+    ).with_columns((pl.col("Risk") / pl.col("Net Sales")).alias("% Risk"))
+
+    base_columns = [c for c in calc.collect_schema().names() if c not in COMPUTED_COLUMNS]
+    return plan.select(base_columns + COMPUTED_COLUMNS).rename(
+        {COUNTRY: SUFFERING_COUNTRY, CUSTOMER: SUFFERING_CUSTOMER}
+    )
+
+
+def aggregate_plan(detail, keys):
+    return detail.filter(
+        pl.all_horizontal([pl.col(k).is_not_null() for k in keys])
+    ).group_by(keys).agg(
+        pl.col("Net Sales").sum(), pl.col("Risk").sum()
+    ).sort(keys).with_columns(
+        (pl.col("Risk") / pl.col("Net Sales")).alias("% Risk")
+    )
+
+
+def _collect(*plans):
+    # Collected together so the shared enrichment subplan runs once
+    return [frame.to_pandas() for frame in pl.collect_all(plans, engine="streaming")]
+
+
+def evaluate(inputs, alliance_type, filters, flag, export=None):
+    """Counterpart of ``engine.evaluate`` running the whole model in Polars.
+
+    The aggregates are collected with the streaming engine; the detailed table
+    is only collected when ``RiskView.detail`` is accessed.
+    """
+    detail = risk_plan(enriched_plan(inputs, alliance_type, export), inputs.corridors, filters)
+    group_col = group_column(flag)
+    agg, agg2 = _collect(aggregate_plan(detail, [group_col]), aggregate_plan(detail, [group_col, CATEGORY]))
+    return RiskView(agg, agg2, group_col, materialize=lambda: _collect(detail)[0])
@@ -0,0 +1,119 @@
+"""Per-stage wall time, row counts and peak memory of a pipeline run.
+
+Profiling is off unless enabled explicitly or through ``RISK_PROFILE=1``;
+``RISK_PROFILE_LOG`` names a JSON-lines file the records are appended to.
+Peak memory is the process-wide tracemalloc high-water mark while the stage
+ran. Tracing starts with the first profiled stage and stops once no stage is
+running, and the peak is only reset when no other stage is in progress, so
+concurrent sessions never disturb each other's measurement; a stage that
+overlaps others (another session's, or an enclosing one) reports the peak of
+everything the process allocated meanwhile.
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+_lock = threading.Lock()
+# Stages currently traced, and whether tracing was started here (not by the caller)
+_active = 0
+_owned = False
+
+
+def _begin_tracing():
+    global _active, _owned
+    with _lock:
+        if _active == 0:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                _owned = True
+        _active += 1
+
+
+def _end_tracing():
+    """The traced peak so far; stops tracing after the last running stage."""
+    global _active, _owned
+    with _lock:
+        peak = tracemalloc.get_traced_memory()[1]
+        _active -= 1
+        if _active == 0 and _owned:
+            tracemalloc.stop()
+            _owned = False
+    return peak
+
+
+def profiling_enabled():
+    return os.environ.get("RISK_PROFILE", "").lower() in ("1", "true", "yes")
+
+
+class StageRecord:
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.seconds = None
+        self.peak_bytes = None
+        self.note = None
+
+    def as_dict(self):
+        return {
+            "stage": self.name,
+            "seconds": self.seconds,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "peak_mb": None if self.peak_bytes is None else self.peak_bytes / 2**20,
+            "note": self.note,
+        }
+
+
+class Profiler:
+    """Collects one StageRecord per ``with profiler.stage(...)`` block."""
+
+    def __init__(self, enabled=None, trace_memory=True):
+        self.enabled = profiling_enabled() if enabled is None else enabled
+        self.trace_memory = trace_memory
+        self.run_id = uuid.uuid4().hex[:12]
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        record = StageRecord(name, rows_in)
+        if not self.enabled:
+            yield record
+            return
+
+        if self.trace_memory:
+            _begin_tracing()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            if self.trace_memory:
+                record.peak_bytes = _end_tracing()
+            self.records.append(record)
+
+    def to_frame(self):
+        return pd.DataFrame(
+            [r.as_dict() for r in self.records],
+            columns=["stage", "seconds", "rows_in", "rows_out", "peak_mb", "note"],
+        )
+
+    def write_log(self, path=None, **context):
+        """Append the records as JSON lines, tagged with the run id and ``context``."""
+        path = path or os.environ.get("RISK_PROFILE_LOG")
+        if not path or not self.records:
+            return
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+        with open(path, "a") as fh:
+            for record in self.records:
+                fh.write(json.dumps({"run": self.run_id, "time": timestamp, **context, **record.as_dict()}) + "\n")
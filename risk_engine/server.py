@@ -0,0 +1,203 @@
+"""risk-api: the country and country x category Risk tables over HTTP/JSON.
+
+    python -m risk_engine.server --port 8765
+
+Endpoints (GET, JSON responses):
+
+- ``/risk``: the by-country and by-country-and-category tables of one view.
+  Takes the sidebar's parameters, named as in ``risk-calc``: ``alliance``
+  (an alliance mapping, default the first), ``flag`` (suffered or generated)
+  and the repeatable filters ``area``, ``country``, ``category`` and
+  ``alliance-filter``, e.g.
+  ``/risk?alliance=Buying+Alliance&flag=generated&area=Europe``;
+- ``/options?alliance=...``: the values the filters can take;
+- ``/health``: data version, reload state and result cache counters.
+
+Requests are served by a thread each, from the process-wide watcher's
+inputs (enriched for every alliance mapping before the server starts) and
+the shared ``RESULT_CACHE``, which holds the encoded response of every view
+asked for; concurrent requests for the same view compute it once.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from .cache import RESULT_CACHE, query_key
+from .columns import ALLIANCE, AREA, CATEGORY, COUNTRY
+from .engine import FLAGS, evaluate
+from .enrich import ALLIANCE_TYPES, get_calc
+from .watcher import get_watcher
+
+log = logging.getLogger(__name__)
+
+# Query parameter -> filter column
+FILTERS = {"area": AREA, "country": COUNTRY, "category": CATEGORY, "alliance-filter": ALLIANCE}
+DEFAULT_PORT = int(os.environ.get("RISK_API_PORT", "8765"))
+
+
+def _one(params, name, choices):
+    values = params.get(name, [choices[0]])
+    if len(values) != 1 or values[0] not in choices:
+        raise ValueError(f"{name} must be one of: {', '.join(choices)}")
+    return values[0]
+
+
+def parse_query(params, allowed=("alliance", "flag", *FILTERS)):
+    """(alliance type, flag, filters) from parsed query parameters."""
+    unknown = sorted(set(params) - set(allowed))
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(unknown)}")
+    alliance_type = _one(params, "alliance", ALLIANCE_TYPES)
+    flag = _one(params, "flag", FLAGS)
+    filters = {column: params.get(name, []) for name, column in FILTERS.items()}
+    return alliance_type, flag, filters
+
+
+def _records(frame):
+    frame = frame.replace([np.inf, -np.inf], np.nan).astype(object)
+    return frame.where(frame.notna(), None).to_dict(orient="records")
+
+
+def _encode(payload):
+    return json.dumps(payload, allow_nan=False).encode()
+
+
+def risk(watcher, params):
+    alliance_type, flag, filters = parse_query(params)
+    inputs = watcher.current
+
+    def compute():
+        calc = get_calc(inputs, alliance_type)
+        # Only the aggregates are served, so the detailed table is never built
+        view = evaluate(calc, inputs.corridor_index, filters, flag, aggregate_first=True)
+        net_sales, total_risk = view.agg["Net Sales"].sum(), view.agg["Risk"].sum()
+        return _encode({
+            "alliance": alliance_type,
+            "flag": flag,
+            "filters": {name: filters[column] for name, column in FILTERS.items() if filters[column]},
+            "group_column": view.group_col,
+            "loaded_at": watcher.loaded_at,
+            "totals": {
+                "Net Sales": float(net_sales),
+                "Risk": float(total_risk),
+                "% Risk": float(total_risk / net_sales) if net_sales else None,
+            },
+            "by_country": _records(view.agg),
+            "by_country_category": _records(view.agg2),
+        })
+
+    return RESULT_CACHE.get_or_compute(
+        query_key(inputs.version, alliance_type, filters, flag, aggregate_first=True, response="json"), compute
+    )
+
+
+def options(watcher, params):
+    alliance_type, _, _ = parse_query(params, allowed=("alliance",))
+    inputs = watcher.current
+
+    def compute():
+        calc = get_calc(inputs, alliance_type)
+        values = {name: sorted(map(str, calc[column].dropna().unique())) for name, column in FILTERS.items()}
+        return _encode({"alliance": alliance_type, "alliances": list(ALLIANCE_TYPES), "flags": list(FLAGS), **values})
+
+    return RESULT_CACHE.get_or_compute(query_key(inputs.version, alliance_type, {}, None, response="options"), compute)
+
+
+def health(watcher, params):
+    return _encode({
+        "status": "ok",
+        # Inputs.version as JSON: [workbook, content hash] pairs, then ["encoded", flag]
+        "version": [list(item) for item in watcher.current.version],
+        "loaded_at": watcher.loaded_at,
+        "rebuilding": watcher.rebuilding,
+        "reload_error": watcher.error,
+        "cache": RESULT_CACHE.stats(),
+    })
+
+
+ROUTES = {"/risk": risk, "/options": options, "/health": health}
+
+
+class RiskHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so clients can reuse a connection across requests
+    protocol_version = "HTTP/1.1"
+    server_version = "risk-api"
+    # Headers and body are separate writes; without this each response waits for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        route = ROUTES.get(url.path)
+        if route is None:
+            self._send(404, _encode({"error": f"Unknown path {url.path!r}"}))
+            return
+        try:
+            body = route(self.server.watcher, parse_qs(url.query))
+        except ValueError as exc:
+            self._send(400, _encode({"error": str(exc)}))
+            return
+        except Exception:
+            log.exception("%s failed", self.path)
+            self._send(500, _encode({"error": "Internal error"}))
+            return
+        self._send(200, body)
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.debug("%s %s", self.address_string(), format % args)
+
+
+class RiskServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for many clients connecting at once (the default, 5, drops SYNs under load)
+    request_queue_size = 128
+
+
+def make_server(host="127.0.0.1", port=DEFAULT_PORT, base_dir=".", **watcher_kwargs):
+    """A RiskServer over the watcher of ``base_dir``, with every alliance mapping enriched."""
+    watcher = get_watcher(base_dir, **watcher_kwargs)
+    for alliance_type in ALLIANCE_TYPES:
+        get_calc(watcher.current, alliance_type)
+    server = RiskServer((host, port), RiskHandler)
+    server.watcher = watcher
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="risk-api", description="Serve the risk tables as JSON over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help="port to listen on (default: $RISK_API_PORT or 8765)")
+    parser.add_argument("--data-dir", default=".", help="directory holding the input workbooks (default: %(default)s)")
+    parser.add_argument("--cache-dir", help="Parquet cache for parsed workbooks (default: <data-dir>/.cache)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    server = make_server(args.host, args.port, args.data_dir, cache_dir=args.cache_dir)
+    host, port = server.server_address[:2]
+    print(f"serving on http://{host}:{port} (ready in {time.perf_counter() - start:.2f}s)", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
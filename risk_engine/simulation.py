@@ -0,0 +1,280 @@
+"""What-if simulation of corridor and price changes.
+
+Overrides multiply a corridor cell or the net price of selected export rows
+by one factor per scenario. ``simulate`` finds the rows the overrides can
+reach and recomputes only those. It works on (scenario x row) arrays, so a
+whole sweep is vectorized (in blocks of scenarios when the arrays would get
+large).
+
+- A price change reaches every row of the comparable groups it touches.
+  Through their new comparable prices it also reaches every row of the
+  (Comparable, Alliance) groups those rows belong to, whose min price and
+  generating row can move.
+- A Corridor Max change reaches the rows with that suffering country and
+  category.
+- A Corridor Min change reaches the rows whose generating country and
+  category match.
+
+Every other row keeps its baseline Risk, so the totals are the baseline plus
+the change over the affected rows.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import CategoricalDtype
+
+from .columns import CATEGORY, COMPARABLE_KEYS, COUNTRY, MIN_PRICE_KEYS, NET_PRICE, VOLUMES
+from .engine import compute_columns, generating_rows, group_column, group_keys
+from .encoding import group_codes
+
+CORRIDOR_COLUMNS = ("Corridor Max", "Corridor Min")
+# Cells of each (scenario x affected row) array; scenarios are evaluated in blocks under it
+MAX_BLOCK_CELLS = 4_000_000
+
+
+@dataclass(frozen=True)
+class CorridorOverride:
+    """Multiply ``column`` of the (country, category) corridor by ``factors[s]`` in scenario s."""
+    country: str
+    category: str
+    column: str
+    factors: tuple
+
+
+@dataclass(frozen=True)
+class PriceOverride:
+    """Multiply the net price of the rows matching ``where`` ({column: values}) by ``factors[s]``."""
+    factors: tuple
+    where: dict = field(default_factory=dict)
+
+
+def sweep(low, high, steps):
+    """Factors for relative changes from ``low`` to ``high`` (e.g. -0.05 to 0.05)."""
+    return tuple(1 + np.linspace(low, high, steps))
+
+
+class Simulation:
+    """Per-scenario totals and by-country results of ``simulate``.
+
+    ``totals`` has one row per scenario; ``by_country`` one row per scenario
+    and country of ``group_col``, both with the change against the baseline.
+    """
+
+    def __init__(self, totals, by_country, group_col, affected_rows):
+        self.totals = totals
+        self.by_country = by_country
+        self.group_col = group_col
+        self.affected_rows = affected_rows
+
+
+def _scenario_count(overrides):
+    counts = {len(o.factors) for o in overrides}
+    if not overrides or counts == {0}:
+        raise ValueError("At least one override with one or more factors is needed")
+    counts.discard(1)
+    if len(counts) > 1:
+        raise ValueError(f"Overrides have different numbers of scenarios: {sorted(counts)}")
+    return counts.pop() if counts else 1
+
+
+def _factors(override, n_scenarios):
+    return np.broadcast_to(np.asarray(override.factors, dtype=float), n_scenarios)
+
+
+def _grouped_sums(keys, values, n_groups):
+    """Sum ``values`` (scenario x row) by ``keys`` (scenario x row or row), -1 keys skipped."""
+    n_scenarios = values.shape[0]
+    keys = np.broadcast_to(keys, values.shape)
+    valid = keys >= 0
+    flat = (np.arange(n_scenarios)[:, None] * n_groups + keys)[valid]
+    return np.bincount(flat, weights=values[valid], minlength=n_scenarios * n_groups).reshape(n_scenarios, n_groups)
+
+
+def _grid_lookup(grid, countries, categories):
+    """Corridor values (scenario x row) from a 2-D or scenario x 2-D grid, NaN for -1 codes."""
+    found = (countries >= 0) & (categories >= 0)
+    countries = np.where(found, countries, 0)
+    categories = np.where(found, categories, 0)
+    if grid.ndim == 2:
+        values = grid[countries, categories]
+    else:
+        values = grid[np.arange(grid.shape[0])[:, None], countries, categories]
+    return np.where(found, values, np.nan)
+
+
+def _codes(values, dtype):
+    return pd.Categorical(values, dtype=dtype).codes.astype(np.int64)
+
+
+def simulate(calc, corridors, filters, flag, overrides, labels=None):
+    """Evaluate the scenarios defined by ``overrides`` against the current view.
+
+    ``calc``, ``corridors`` (a CorridorIndex), ``filters`` and ``flag`` are
+    those of ``evaluate``. Factors of length 1 apply to every scenario.
+    """
+    group_col = group_column(flag)
+    n_scenarios = _scenario_count(overrides)
+    labels = list(range(n_scenarios)) if labels is None else list(labels)
+    if len(labels) != n_scenarios:
+        raise ValueError(f"{len(labels)} labels for {n_scenarios} scenarios")
+
+    df, base = compute_columns(calc, corridors, filters)
+    n_rows = len(df)
+    volumes = df[VOLUMES].to_numpy(dtype=float)
+    base_generating = generating_rows(df, base["Comparable Price"])
+    row_countries = _codes(df[COUNTRY].array, corridors.countries)
+    row_categories = _codes(df[CATEGORY].array, corridors.categories)
+
+    # Scenario corridor grids, only for the columns that are overridden
+    grids = {column: corridors.values[column] for column in CORRIDOR_COLUMNS}
+    corridor_rows = np.zeros(n_rows, dtype=bool)
+    for override in overrides:
+        if not isinstance(override, CorridorOverride):
+            continue
+        if override.column not in CORRIDOR_COLUMNS:
+            raise ValueError(f"Unknown corridor column: {override.column!r}")
+        country = _codes([override.country], corridors.countries)[0]
+        category = _codes([override.category], corridors.categories)[0]
+        if country < 0 or category < 0:
+            raise ValueError(f"No corridor for {override.country}/{override.category}")
+        grid = grids[override.column]
+        if grid.ndim == 2:
+            grid = grids[override.column] = np.repeat(grid[None], n_scenarios, axis=0)
+        grid[:, country, category] *= _factors(override, n_scenarios)
+
+        countries = row_countries if override.column == "Corridor Max" else np.where(
+            base_generating >= 0, row_countries[base_generating], -1
+        )
+        corridor_rows |= (countries == country) & (row_categories == category)
+
+    # Net price factors for the rows some price override selects
+    price_rows = np.zeros(n_rows, dtype=bool)
+    selections = []
+    for override in overrides:
+        if isinstance(override, PriceOverride):
+            selected = np.ones(n_rows, dtype=bool)
+            for column, values in override.where.items():
+                if values:
+                    selected &= df[column].isin(values).to_numpy()
+            selections.append((selected, _factors(override, n_scenarios)))
+            price_rows |= selected
+
+    # Rows reached through the comparable groups and then the min-price groups
+    comparable_codes, _ = group_codes(df, group_keys(df, COMPARABLE_KEYS))
+    min_codes, _ = group_codes(df, group_keys(df, MIN_PRICE_KEYS))
+    touched = np.unique(comparable_codes[price_rows & (comparable_codes >= 0)])
+    repriced = np.isin(comparable_codes, touched) & (comparable_codes >= 0)
+    regrouped = np.isin(min_codes, np.unique(min_codes[repriced & (min_codes >= 0)])) & (min_codes >= 0)
+    rows = np.flatnonzero(repriced | regrouped | corridor_rows)
+
+    # Scenario-independent layout of the repriced and regrouped rows
+    repriced_rows = np.flatnonzero(repriced)
+    repriced_local = pd.factorize(comparable_codes[repriced_rows])[0]
+    repriced_at = np.searchsorted(rows, repriced_rows)
+    weighted = np.nan_to_num(df[NET_PRICE].to_numpy(dtype=float)[repriced_rows] * volumes[repriced_rows])
+    # Stable sort keeps row order within a group, so the first min match is idxmin's
+    regrouped_rows = np.flatnonzero(regrouped)
+    sorted_rows = regrouped_rows[np.argsort(min_codes[regrouped_rows], kind="stable")]
+    _, starts, counts = np.unique(min_codes[sorted_rows], return_index=True, return_counts=True)
+    sorted_at = np.searchsorted(rows, sorted_rows)
+    segment = np.repeat(np.arange(len(starts)), counts)
+
+    # Group keys: Suffering Country is fixed, Generating Country can move
+    country_labels = df[COUNTRY]
+    dtype = country_labels.dtype if isinstance(country_labels.dtype, CategoricalDtype) else CategoricalDtype(
+        sorted(pd.unique(country_labels.dropna()), key=str)
+    )
+    country_codes = _codes(country_labels.array, dtype)
+    n_groups = len(dtype.categories)
+    if flag == "suffered":
+        base_keys = country_codes
+    else:
+        base_keys = np.where(base_generating >= 0, country_codes[np.maximum(base_generating, 0)], -1)
+    unaffected_keys = base_keys.copy()
+    unaffected_keys[rows] = -1
+    base_net_sales = np.nan_to_num(base["Net Sales"])
+    base_risk = base["Risk"]
+
+    def evaluate_block(block):
+        """Net Sales and Risk of the affected rows by group, for the scenarios in ``block``."""
+        n_block = block.stop - block.start
+        comparable_price = np.broadcast_to(base["Comparable Price"][rows], (n_block, len(rows))).copy()
+        if len(repriced_rows):
+            factors = np.ones((n_block, len(repriced_rows)))
+            for selected, scenario_factors in selections:
+                factors[:, selected[repriced_rows]] *= scenario_factors[block, None]
+            sums = _grouped_sums(repriced_local, weighted * factors, len(touched))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                comparable_price[:, repriced_at] = sums[:, repriced_local] / base["Comparable Volumes"][repriced_rows]
+
+        min_price = np.broadcast_to(base["Min Price"][rows], comparable_price.shape).copy()
+        generating = np.broadcast_to(base_generating[rows], comparable_price.shape).copy()
+        if len(sorted_rows):
+            prices = comparable_price[:, sorted_at]
+            with np.errstate(invalid="ignore"):
+                group_min = np.fmin.reduceat(prices, starts, axis=1)
+            is_min = prices == group_min[:, segment]
+            first = np.minimum.reduceat(np.where(is_min, np.arange(len(sorted_rows)), len(sorted_rows)), starts, axis=1)
+            found = first < len(sorted_rows)
+            group_generating = np.where(found, sorted_rows[np.where(found, first, 0)], -1)
+            min_price[:, sorted_at] = group_min[:, segment]
+            generating[:, sorted_at] = group_generating[:, segment]
+
+        block_grids = {column: grid if grid.ndim == 2 else grid[block] for column, grid in grids.items()}
+        generating_countries = np.where(generating >= 0, row_countries[np.maximum(generating, 0)], -1)
+        max_corridor = _grid_lookup(block_grids["Corridor Max"], row_countries[rows], row_categories[rows])
+        min_corridor = _grid_lookup(block_grids["Corridor Min"], generating_countries, row_categories[rows])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            net_sales = comparable_price * volumes[rows]
+            risk = np.clip(net_sales - min_price * volumes[rows] * (max_corridor / min_corridor), 0, None)
+            risk[np.isnan(risk)] = 0
+
+        if flag == "suffered":
+            keys = country_codes[rows]
+        else:
+            keys = np.where(generating >= 0, country_codes[np.maximum(generating, 0)], -1)
+        return (
+            _grouped_sums(keys, np.nan_to_num(net_sales), n_groups),
+            _grouped_sums(keys, risk, n_groups),
+            _grouped_sums(keys, np.ones(risk.shape), n_groups) > 0,
+        )
+
+    # Scenarios are evaluated in blocks so the (scenario x row) arrays stay bounded
+    block_size = max(1, min(n_scenarios, MAX_BLOCK_CELLS // max(len(rows), 1)))
+    blocks = [evaluate_block(slice(lo, min(lo + block_size, n_scenarios))) for lo in range(0, n_scenarios, block_size)]
+    rest_net_sales = _grouped_sums(unaffected_keys, base_net_sales[None], n_groups)
+    rest_risk = _grouped_sums(unaffected_keys, base_risk[None], n_groups)
+    country_net_sales = rest_net_sales + np.concatenate([b[0] for b in blocks])
+    country_risk = rest_risk + np.concatenate([b[1] for b in blocks])
+    base_net_sales_by = _grouped_sums(base_keys, base_net_sales[None], n_groups)[0]
+    base_risk_by = _grouped_sums(base_keys, base_risk[None], n_groups)[0]
+    present = (_grouped_sums(base_keys, np.ones((1, n_rows)), n_groups)[0] > 0) | np.concatenate(
+        [b[2] for b in blocks]
+    ).any(axis=0)
+
+    # Totals over the countries, as the aggregated tables report them
+    total_net_sales = country_net_sales.sum(axis=1)
+    total_risk = country_risk.sum(axis=1)
+    totals = pd.DataFrame({
+        "Scenario": labels,
+        "Net Sales": total_net_sales,
+        "Risk": total_risk,
+        "% Risk": total_risk / total_net_sales,
+        "Delta Net Sales": total_net_sales - base_net_sales_by.sum(),
+        "Delta Risk": total_risk - base_risk_by.sum(),
+    })
+
+    groups = np.flatnonzero(present)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        by_country = pd.DataFrame({
+            "Scenario": np.repeat(labels, len(groups)),
+            group_col: np.tile(np.asarray(dtype.categories, dtype=object)[groups], n_scenarios),
+            "Net Sales": country_net_sales[:, groups].ravel(),
+            "Risk": country_risk[:, groups].ravel(),
+            "% Risk": (country_risk[:, groups] / country_net_sales[:, groups]).ravel(),
+            "Delta Net Sales": (country_net_sales[:, groups] - base_net_sales_by[groups]).ravel(),
+            "Delta Risk": (country_risk[:, groups] - base_risk_by[groups]).ravel(),
+        })
+    return Simulation(totals, by_country, group_col, len(rows))
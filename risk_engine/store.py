@@ -0,0 +1,97 @@
+"""Process-wide accounting of the data shared by every app session.
+
+The parsed workbooks (``loader``), their encoded form (``encoding``), the
+enriched frames (``enrich``) and the computed views (``cache.RESULT_CACHE``)
+live in module-level caches, so every session references the same frames and
+a session only owns its widget selections. This module tracks the active
+sessions and reports how the process memory divides between them.
+"""
+
+import os
+import resource
+import sys
+import threading
+import time
+
+from . import encoding, loader
+from .cache import RESULT_CACHE
+from .enrich import cached_frames as enriched_frames
+
+# Sessions not seen for this long no longer count as active
+SESSION_TTL = 30 * 60
+
+
+class SessionRegistry:
+    def __init__(self, ttl=SESSION_TTL):
+        self.ttl = ttl
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def touch(self, session_id):
+        with self._lock:
+            self._seen[session_id] = time.monotonic()
+
+    def active(self):
+        cutoff = time.monotonic() - self.ttl
+        with self._lock:
+            for session_id in [s for s, seen in self._seen.items() if seen < cutoff]:
+                del self._seen[session_id]
+            return len(self._seen)
+
+
+SESSIONS = SessionRegistry()
+
+
+def _frame_bytes(frame):
+    return int(frame.memory_usage(deep=True).sum())
+
+
+def shared_nbytes():
+    """Bytes held by each process-wide cache, counting every frame once."""
+    seen = set()
+
+    def total(frames):
+        size = 0
+        for frame in frames:
+            if id(frame) not in seen:
+                seen.add(id(frame))
+                size += _frame_bytes(frame)
+        return size
+
+    return {
+        "workbooks": total(loader.cached_frames()),
+        "encoded": total(encoding.cached_frames()),
+        "enriched": total(enriched_frames()),
+        "views": RESULT_CACHE.nbytes,
+    }
+
+
+def rss_bytes():
+    """Current resident set size of the process (peak where not available)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and KiB elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def memory_report(sessions=SESSIONS):
+    """Process memory, the part of it in the shared caches, and the rest per active session.
+
+    ``unshared_per_session`` divides what the shared caches don't account
+    for (interpreter, libraries, session state, transient frames) between
+    the active sessions: an upper bound on what one more session costs.
+    """
+    shared = shared_nbytes()
+    active = max(sessions.active(), 1)
+    rss = rss_bytes()
+    shared_total = sum(shared.values())
+    return {
+        "rss": rss,
+        "shared": shared_total,
+        "shared_by_cache": shared,
+        "sessions": active,
+        "unshared_per_session": max(rss - shared_total, 0) / active,
+    }
@@ -0,0 +1,99 @@
+"""Streaming reader for large Export workbooks.
+
+``pd.read_excel`` materializes every cell of the sheet as openpyxl objects
+before building the frame. This reader walks the sheet in openpyxl read-only
+mode, keeps only the columns the model uses and appends each chunk of rows to
+typed arrays: float64 for the measures and dictionary codes for the labels.
+"""
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from .columns import COUNTRY, CUSTOMER, NET_PRICE, PRODUCT, VOLUMES
+
+EXPORT_COLUMNS = [COUNTRY, CUSTOMER, PRODUCT, VOLUMES, NET_PRICE]
+NUMERIC_COLUMNS = {VOLUMES, NET_PRICE}
+
+
+class _LabelColumn:
+    """Incremental dictionary encoding of one text column."""
+
+    def __init__(self):
+        self.labels = {}
+        self.chunks = []
+
+    def append(self, values):
+        codes = np.empty(len(values), dtype=np.int32)
+        labels = self.labels
+        for i, value in enumerate(values):
+            if value is None:
+                codes[i] = -1
+            else:
+                codes[i] = labels.setdefault(value, len(labels))
+        self.chunks.append(codes)
+
+    def finish(self):
+        codes = np.concatenate(self.chunks) if self.chunks else np.empty(0, dtype=np.int32)
+        categories = list(self.labels)
+        # Sort the dictionary the same way as build_dimensions()
+        order = np.array(sorted(range(len(categories)), key=lambda i: str(categories[i])), dtype=np.intp)
+        remap = np.empty(len(categories), dtype=np.int32)
+        remap[order] = np.arange(len(categories), dtype=np.int32)
+        codes = np.where(codes >= 0, remap[np.maximum(codes, 0)], -1)
+        return pd.Categorical.from_codes(codes, [categories[i] for i in order])
+
+
+class _NumberColumn:
+    def __init__(self):
+        self.chunks = []
+
+    def append(self, values):
+        try:
+            chunk = np.array(values, dtype=float)
+        except (TypeError, ValueError):
+            # Text in a numeric column reads as missing
+            chunk = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=float)
+        self.chunks.append(chunk)
+
+    def finish(self):
+        return np.concatenate(self.chunks) if self.chunks else np.empty(0)
+
+
+def read_export_streaming(path, columns=EXPORT_COLUMNS, chunk_size=50_000, sheet_name=0):
+    """Read ``columns`` of an Export workbook chunk by chunk.
+
+    Text columns come back as Categoricals and measures as float64; rows that
+    are empty in every selected column are skipped.
+    """
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        missing = [c for c in columns if c not in header]
+        if missing:
+            raise ValueError(f"{path}: missing columns {missing}")
+        positions = [header.index(c) for c in columns]
+
+        builders = {c: _NumberColumn() if c in NUMERIC_COLUMNS else _LabelColumn() for c in columns}
+        buffer = []
+
+        def flush():
+            for column, values in zip(columns, zip(*buffer)):
+                builders[column].append(values)
+            buffer.clear()
+
+        for row in rows:
+            values = tuple(row[p] if p < len(row) else None for p in positions)
+            if all(v is None for v in values):
+                continue
+            buffer.append(values)
+            if len(buffer) >= chunk_size:
+                flush()
+        if buffer:
+            flush()
+    finally:
+        workbook.close()
+
+    return pd.DataFrame({c: builders[c].finish() for c in columns})
@@ -0,0 +1,252 @@
+"""Pre-flight checks of the input workbooks.
+
+Runs once per input version, before enrichment, with whole-column
+operations only. It reports:
+
+- join keys that are not unique and would multiply export rows (Product
+  Registry products and Comparable -> Category, Mapping Area countries), or
+  that the lookup indexes reject (Mapping BA/IA customers, Corridors keys);
+- export rows the joins can't match (products, countries, customers per
+  alliance mapping);
+- zero, negative or missing volumes and prices, and comparable groups whose
+  volumes sum to zero (no Comparable Price);
+- export (country, category) pairs with no corridor, whose Risk is 0.
+
+With the ``block`` policy (``RISK_VALIDATION=block``), errors (row-multiplying
+joins, conflicting keys) stop the load; with ``flag``, the default, they are
+reported and the data is used as is, a conflicting key taking its first row.
+"""
+
+import os
+import threading
+
+import pandas as pd
+
+from .columns import COUNTRY, CUSTOMER, NET_PRICE, PRODUCT, VOLUMES
+from .customers import normalize
+from .loader import KEEP_VERSIONS
+
+POLICIES = ("flag", "block")
+REGISTRY_COMPARABLE = "Product Hierarchy - Comparable Product"
+REGISTRY_CATEGORY = "Product Hierarchy - Category"
+MAX_EXAMPLES = 5
+
+ISSUE_COLUMNS = ["Check", "Severity", "Workbook", "Rows", "Multiplies Rows", "Detail", "Examples"]
+
+_lock = threading.Lock()
+# input version -> ValidationReport
+_memo = {}
+
+
+def validation_policy():
+    policy = os.environ.get("RISK_VALIDATION", "flag").lower()
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown validation policy: {policy!r} (expected one of {', '.join(POLICIES)})")
+    return policy
+
+
+class ValidationError(ValueError):
+    """Inputs rejected by the ``block`` policy; ``report`` is the full ValidationReport."""
+
+    def __init__(self, message, report):
+        super().__init__(message)
+        self.report = report
+
+
+class ValidationReport:
+    """Issues found in one version of the inputs, one row per check that failed."""
+
+    def __init__(self, issues):
+        self.issues = pd.DataFrame(issues, columns=ISSUE_COLUMNS)
+
+    @property
+    def ok(self):
+        return self.issues.empty
+
+    @property
+    def multiplying(self):
+        """The issues that make a join multiply export rows."""
+        return self.issues[self.issues["Multiplies Rows"]]
+
+    @property
+    def errors(self):
+        """The issues the ``block`` policy rejects."""
+        return self.issues[self.issues["Severity"] == "error"]
+
+    def summary(self):
+        return "; ".join(
+            f"{issue.Workbook}: {issue.Detail} ({issue.Examples})" if issue.Examples else f"{issue.Workbook}: {issue.Detail}"
+            for issue in self.issues.itertuples()
+        )
+
+
+def _examples(values):
+    values = pd.unique(pd.Series(values).dropna().astype(str))
+    listed = ", ".join(values[:MAX_EXAMPLES])
+    return listed + (f" and {len(values) - MAX_EXAMPLES} more" if len(values) > MAX_EXAMPLES else "")
+
+
+def _fan_out(issues, workbook, lookup, key, export_keys, what):
+    """Flag ``key`` values appearing more than once in ``lookup``, with the extra export rows a join adds."""
+    counts = lookup[key].dropna().value_counts()
+    repeated = counts[counts > 1]
+    if repeated.empty:
+        return
+    extra = int(export_keys.astype(object).map(repeated.astype(object) - 1).fillna(0).sum())
+    issues.append({
+        "Check": "unique key",
+        "Severity": "error",
+        "Workbook": workbook,
+        "Rows": extra,
+        "Multiplies Rows": True,
+        "Detail": f"{what.capitalize()}: {len(repeated)}; the join adds {extra:,} export rows",
+        "Examples": _examples(repeated.index),
+    })
+
+
+def _coverage(issues, workbook, export_keys, known, what):
+    missing = export_keys.notna() & ~export_keys.isin(known)
+    if missing.any():
+        issues.append({
+            "Check": "join coverage",
+            "Severity": "warning",
+            "Workbook": workbook,
+            "Rows": int(missing.sum()),
+            "Multiplies Rows": False,
+            "Detail": f"{int(missing.sum()):,} export rows have a {what} missing from {workbook}",
+            "Examples": _examples(export_keys[missing]),
+        })
+
+
+def validate(inputs):
+    """Run every check on ``inputs`` and return a ValidationReport."""
+    issues = []
+    export, registry, mapping_area = inputs.export, inputs.product_registry, inputs.mapping_area
+
+    # Row-multiplying joins
+    _fan_out(issues, "Product Registry.xlsx", registry, PRODUCT, export[PRODUCT], "products listed more than once")
+    comp_to_cat = registry[[REGISTRY_COMPARABLE, REGISTRY_CATEGORY]].drop_duplicates()
+    comparables = export[PRODUCT].astype(object).map(
+        registry.drop_duplicates(PRODUCT).set_index(PRODUCT)[REGISTRY_COMPARABLE].astype(object)
+    )
+    _fan_out(issues, "Product Registry.xlsx", comp_to_cat, REGISTRY_COMPARABLE, comparables,
+             "comparables in more than one category")
+    _fan_out(issues, "Mapping Area.xlsx", mapping_area, "Country", export[COUNTRY], "countries listed more than once")
+
+    # Keys the lookup indexes reject or collapse
+    for workbook, mapping in (("Mapping BA.xlsx", inputs.mapping_ba), ("Mapping IA.xlsx", inputs.mapping_ia)):
+        keys = pd.DataFrame({"key": normalize(mapping["Customer Name"]), "alliance": mapping["Alliance"].astype(object)})
+        keys = keys.dropna()
+        repeated = keys[keys["key"].duplicated(keep=False)]
+        conflicting = repeated.groupby("key")["alliance"].nunique() > 1
+        if conflicting.any():
+            issues.append({
+                "Check": "unique key", "Severity": "error", "Workbook": workbook, "Rows": int(conflicting.sum()),
+                "Multiplies Rows": False,
+                "Detail": f"{int(conflicting.sum())} customers are mapped to different alliances; the first row is used",
+                "Examples": _examples(conflicting[conflicting].index),
+            })
+        elif not repeated.empty:
+            issues.append({
+                "Check": "unique key", "Severity": "warning", "Workbook": workbook, "Rows": len(repeated),
+                "Multiplies Rows": False,
+                "Detail": f"{repeated['key'].nunique()} customers are listed more than once (same alliance, counted once)",
+                "Examples": _examples(repeated["key"]),
+            })
+    corridor_keys = inputs.corridors[["Country", "Attribute"]].astype(object)
+    duplicated = corridor_keys.duplicated(keep=False)
+    if duplicated.any():
+        issues.append({
+            "Check": "unique key", "Severity": "error", "Workbook": "Corridors.xlsx", "Rows": int(duplicated.sum()),
+            "Multiplies Rows": False,
+            "Detail": f"{int(duplicated.sum())} rows share a (Country, Attribute) key; the first row is used",
+            "Examples": _examples(corridor_keys[duplicated].agg("/".join, axis=1)),
+        })
+
+    # Join coverage
+    _coverage(issues, "Product Registry.xlsx", export[PRODUCT], registry[PRODUCT], "product")
+    _coverage(issues, "Mapping Area.xlsx", export[COUNTRY], mapping_area["Country"], "country")
+    customer_keys = normalize(export[CUSTOMER])
+    for alliance_type, workbook, mapping in (
+        ("Buying Alliance", "Mapping BA.xlsx", inputs.mapping_ba),
+        ("International Alliance", "Mapping IA.xlsx", inputs.mapping_ia),
+    ):
+        unmatched = customer_keys.notna() & ~customer_keys.isin(normalize(mapping["Customer Name"]))
+        if unmatched.any():
+            issues.append({
+                "Check": "join coverage", "Severity": "warning", "Workbook": workbook, "Rows": int(unmatched.sum()),
+                "Multiplies Rows": False,
+                "Detail": f"{int(unmatched.sum()):,} export rows have no {alliance_type} and are excluded in that mode",
+                "Examples": _examples(export[CUSTOMER][unmatched.to_numpy()]),
+            })
+
+    # Volumes and prices
+    volumes = pd.to_numeric(export[VOLUMES], errors="coerce")
+    prices = pd.to_numeric(export[NET_PRICE], errors="coerce")
+    for label, mask in (
+        ("zero volumes", volumes == 0),
+        ("negative volumes", volumes < 0),
+        ("missing volumes", volumes.isna()),
+        ("missing net prices", prices.isna()),
+    ):
+        if mask.any():
+            issues.append({
+                "Check": "values", "Severity": "warning", "Workbook": "Export.xlsx", "Rows": int(mask.sum()),
+                "Multiplies Rows": False, "Detail": f"{int(mask.sum()):,} export rows have {label}",
+                "Examples": _examples(export[PRODUCT][mask.to_numpy()]),
+            })
+    groups = pd.DataFrame({
+        "comparable": comparables.to_numpy(), "country": export[COUNTRY].astype(object).to_numpy(),
+        "customer": export[CUSTOMER].astype(object).to_numpy(), "volumes": volumes.to_numpy(),
+    })
+    group_volumes = groups.groupby(["comparable", "country", "customer"])["volumes"].transform("sum")
+    no_price = (group_volumes == 0).to_numpy()
+    if no_price.any():
+        issues.append({
+            "Check": "values", "Severity": "warning", "Workbook": "Export.xlsx", "Rows": int(no_price.sum()),
+            "Multiplies Rows": False,
+            "Detail": f"{int(no_price.sum()):,} export rows are in comparable groups with zero total volume (no Comparable Price)",
+            "Examples": _examples(groups["comparable"][no_price]),
+        })
+
+    # Corridors for the (country, category) pairs the export needs
+    categories = comparables.map(comp_to_cat.drop_duplicates(REGISTRY_COMPARABLE).set_index(REGISTRY_COMPARABLE)[
+        REGISTRY_CATEGORY
+    ].astype(object))
+    pairs = pd.MultiIndex.from_arrays([export[COUNTRY].astype(object).to_numpy(), categories.to_numpy()])
+    known = pd.MultiIndex.from_frame(corridor_keys)
+    needed = pairs.get_level_values(0).notna() & pairs.get_level_values(1).notna()
+    missing = needed & ~pairs.isin(known)
+    if missing.any():
+        issues.append({
+            "Check": "missing corridor", "Severity": "warning", "Workbook": "Corridors.xlsx",
+            "Rows": int(missing.sum()), "Multiplies Rows": False,
+            "Detail": f"{int(missing.sum()):,} export rows have no corridor for their (country, category); their Risk is 0",
+            "Examples": _examples([f"{c}/{k}" for c, k in pairs[missing]]),
+        })
+    return ValidationReport(issues)
+
+
+def validate_inputs(inputs):
+    """The memoized report for this version of the inputs."""
+    with _lock:
+        report = _memo.get(inputs.version)
+    if report is None:
+        report = validate(inputs)
+        with _lock:
+            _memo[inputs.version] = report
+            while len(_memo) > KEEP_VERSIONS:
+                del _memo[next(iter(_memo))]
+    return report
+
+
+def preflight(inputs, policy=None):
+    """Validate ``inputs``; under the ``block`` policy, reject them if any check found an error."""
+    policy = policy or validation_policy()
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown validation policy: {policy!r} (expected one of {', '.join(POLICIES)})")
+    report = validate_inputs(inputs)
+    errors = report.errors
+    if policy == "block" and not errors.empty:
+        raise ValidationError("Input workbooks failed validation: " + ValidationReport(errors).summary(), report)
+    return report
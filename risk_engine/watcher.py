@@ -0,0 +1,124 @@
+"""Hot reload of the input workbooks.
+
+A ``DataWatcher`` polls the workbooks' stat signatures from a background
+thread. Once a changed file has stopped changing it builds the next version
+of the inputs: only the changed workbooks are re-parsed (``loader``), the
+enriched frames are rebuilt only when a workbook they depend on changed (a
+Corridors change just rebuilds the corridor index) and the new version is
+swapped in atomically. Until then ``current`` keeps returning the previous
+version.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from .enrich import ALLIANCE_TYPES, get_calc, prewarm
+from .loader import WORKBOOKS, load_inputs
+
+log = logging.getLogger(__name__)
+
+POLL_INTERVAL = float(os.environ.get("RISK_WATCH_INTERVAL", "5"))
+
+
+class DataWatcher:
+    def __init__(self, base_dir=".", interval=POLL_INTERVAL, alliance_types=ALLIANCE_TYPES, **load_kwargs):
+        self.base_dir = base_dir
+        self.interval = interval
+        self.alliance_types = alliance_types
+        self.load_kwargs = load_kwargs
+        self.error = None
+        self.loaded_at = None
+        self.rebuilding = False
+        self._signature = self._stat()
+        # The first version is served as soon as it is parsed; the enriched
+        # frames follow in the background
+        self._current = self._build(enrich=False)
+        prewarm(self._current, alliance_types)
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def current(self):
+        """The latest fully built Inputs."""
+        return self._current
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="risk-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _stat(self):
+        signature = {}
+        for name, (filename, _) in WORKBOOKS.items():
+            try:
+                stat = os.stat(os.path.join(self.base_dir, filename))
+                signature[name] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                signature[name] = None
+        return signature
+
+    def _build(self, enrich=True):
+        inputs = load_inputs(self.base_dir, **self.load_kwargs)
+        if enrich:
+            for alliance_type in self.alliance_types:
+                # No-op when only Corridors changed: the enrichment version is the same
+                get_calc(inputs, alliance_type)
+        self.loaded_at = time.time()
+        return inputs
+
+    def check(self):
+        """Rebuild and swap in a new version if a workbook changed; return True if swapped."""
+        pending = self._stat()
+        if pending == self._signature:
+            return False
+
+        # Wait for the file to stop changing (e.g. a copy still in progress)
+        time.sleep(min(self.interval, 1.0))
+        if self._stat() != pending:
+            return False
+
+        changed = [name for name in pending if pending[name] != self._signature.get(name)]
+        log.info("Input workbooks changed: %s", ", ".join(changed))
+        self.rebuilding = True
+        try:
+            inputs = self._build()
+        except Exception as exc:
+            # Half-written or invalid file: keep serving the previous version
+            log.exception("Reloading %s failed", ", ".join(changed))
+            self.error = f"{', '.join(changed)}: {exc}"
+            self._signature = pending
+            return False
+        finally:
+            self.rebuilding = False
+
+        self._signature = pending
+        self.error = None
+        self._current = inputs
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                log.exception("Input watcher iteration failed")
+
+
+_watchers = {}
+_lock = threading.Lock()
+
+
+def get_watcher(base_dir=".", **kwargs):
+    """The process-wide started watcher for ``base_dir``."""
+    key = os.path.abspath(base_dir)
+    with _lock:
+        watcher = _watchers.get(key)
+        if watcher is None:
+            watcher = _watchers[key] = DataWatcher(base_dir, **kwargs).start()
+    return watcher
@@ -0,0 +1,119 @@
+"""Chunked Parquet, CSV and xlsx writers for the result tables.
+
+Each writer walks the frame in row chunks and streams them to the target
+(openpyxl in write-only mode for xlsx), so an export never holds more than
+one chunk of converted rows on top of the computed frame.
+"""
+
+import io
+import os
+import tempfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+CHUNK_ROWS = 50_000
+# Sheet rows, header included
+XLSX_MAX_ROWS = 1_048_576
+
+# format -> (file extension, MIME type)
+FORMATS = {
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "csv": (".csv", "text/csv"),
+    "xlsx": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def _chunks(frame, columns, chunk_rows):
+    frame = frame if columns is None else frame[list(columns)]
+    for start in range(0, len(frame), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows]
+
+
+def _parquet_schema(frame):
+    """Arrow schema of ``frame``, fixed for every chunk.
+
+    Object columns carry no type until they hold a value, so they are typed
+    from their first non-missing value rather than left as ``null``.
+    """
+    schema = pa.Schema.from_pandas(frame.iloc[:0], preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            present = frame[field.name].notna().to_numpy()
+            if present.any():
+                first = present.argmax()
+                sample = pa.Array.from_pandas(frame[field.name].iloc[first:first + 1])
+                schema = schema.set(i, field.with_type(sample.type))
+    return schema
+
+
+def write_parquet(frame, target, columns=None, chunk_rows=CHUNK_ROWS):
+    selected = frame if columns is None else frame[list(columns)]
+    schema = _parquet_schema(selected)
+    with pq.ParquetWriter(target, schema) as writer:
+        for chunk in _chunks(selected, None, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def write_csv(frame, target, columns=None, chunk_rows=CHUNK_ROWS):
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, "w", encoding="utf-8", newline="") as fh:
+            return write_csv(frame, fh, columns=columns, chunk_rows=chunk_rows)
+
+    text = target if isinstance(target, io.TextIOBase) else io.TextIOWrapper(target, encoding="utf-8", newline="")
+    header = True
+    for chunk in _chunks(frame, columns, chunk_rows):
+        chunk.to_csv(text, index=False, header=header)
+        header = False
+    if header:
+        frame.iloc[:0].to_csv(text, index=False, columns=columns)
+    text.flush()
+    if text is not target:
+        # Hand the binary target back to the caller open
+        text.detach()
+
+
+def write_xlsx(frame, target, columns=None, chunk_rows=CHUNK_ROWS, sheet_name="Risk"):
+    if len(frame) + 1 > XLSX_MAX_ROWS:
+        raise ValueError(f"{len(frame):,} rows don't fit in one Excel sheet; export Parquet or CSV instead")
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append(list(frame.columns if columns is None else columns))
+    for chunk in _chunks(frame, columns, chunk_rows):
+        # Plain Python values; missing cells are left empty rather than NaN
+        for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(target)
+
+
+WRITERS = {"parquet": write_parquet, "csv": write_csv, "xlsx": write_xlsx}
+
+
+def write_frame(frame, target, fmt, columns=None, chunk_rows=CHUNK_ROWS):
+    """Write ``frame`` (optionally only ``columns``) to a path or binary file."""
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown output format: {fmt!r}")
+    WRITERS[fmt](frame, target, columns=columns, chunk_rows=chunk_rows)
+
+
+def spool(frame, fmt, columns=None, chunk_rows=CHUNK_ROWS):
+    """``frame`` written to an anonymous temporary file, rewound for reading."""
+    handle = tempfile.TemporaryFile()
+    try:
+        write_frame(frame, handle, fmt, columns=columns, chunk_rows=chunk_rows)
+    except BaseException:
+        handle.close()
+        raise
+    handle.seek(0)
+    return handle
+
+
+def file_name(stem, fmt):
+    return stem + FORMATS[fmt][0]
+
+
+def to_bytes(frame, fmt, columns=None, chunk_rows=CHUNK_ROWS):
+    """The encoded file contents, built through the temporary file."""
+    with spool(frame, fmt, columns=columns, chunk_rows=chunk_rows) as handle:
+        return handle.read()
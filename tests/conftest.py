@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from risk_engine import load_inputs  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def data_dir():
+    return ROOT
+
+
+@pytest.fixture(scope="session")
+def inputs(data_dir, tmp_path_factory):
+    """The shipped workbooks, encoded, with a throwaway Parquet cache."""
+    return load_inputs(data_dir, tmp_path_factory.mktemp("cache"))
+
+
+def plain(frame):
+    """Categoricals and strings as plain text, so frames compare on values."""
+    return frame.astype({c: str for c in frame.columns if not pd.api.types.is_numeric_dtype(frame[c])})
@@ -0,0 +1,60 @@
+"""Normalized customer matching of the alliance mappings."""
+
+import pandas as pd
+import pytest
+
+from risk_engine.customers import MODERN_TRADE, CustomerIndex, normalize
+
+
+def mapping(rows):
+    return pd.DataFrame(rows, columns=["Customer Name", "Alliance"])
+
+
+def alliances(export, rows, categorical=False):
+    customers = pd.Series(export, dtype="category" if categorical else object)
+    index = CustomerIndex(customers, {"Buying Alliance": mapping(rows)})
+    return index, labels(index.alliance("Buying Alliance"))
+
+
+def labels(alliance):
+    """Alliance labels, None where unmapped."""
+    return [None if pd.isna(value) else value for value in alliance]
+
+
+def test_normalize():
+    assert normalize(["  ASDA ", "Asda\tStores", "asda   stores", "STRASSE", "Straße", None]).tolist() == [
+        "asda", "asda stores", "asda stores", "strasse", "strasse", pd.NA,
+    ]
+
+
+@pytest.mark.parametrize("categorical", [False, True], ids=["object", "categorical"])
+def test_whitespace_and_case_variants(categorical):
+    export = ["ASDA", " asda ", "Asda  Stores", "asda stores", "TESCO", "Straße", None]
+    rows = [("asda", "Agecore"), ("ASDA STORES", "Epic"), ("Strasse", "Coopernic")]
+    _, result = alliances(export, rows, categorical)
+    assert result == ["Agecore", "Agecore", "Epic", "Epic", None, "Coopernic", None]
+
+
+def test_same_alliance_duplicates_counted_once():
+    index, result = alliances(["Asda", "Tesco"], [("ASDA", "Agecore"), (" asda", "Agecore"), ("Tesco", "Epic")])
+    assert result == ["Agecore", "Epic"]
+    assert index.conflicts["Buying Alliance"] == []
+
+
+def test_conflicting_duplicates_keep_the_first_row():
+    index, result = alliances(["Asda", "Tesco"], [("Asda", "Agecore"), ("ASDA ", "Epic"), ("Tesco", "Epic")])
+    assert result == ["Agecore", "Epic"]
+    assert index.conflicts["Buying Alliance"] == ["asda"]
+
+
+def test_modern_trade_and_unmatched():
+    export = pd.Series([" modern  TRADE", "Asda", "Unknown", "Unknown"])
+    index = CustomerIndex(export, {"Buying Alliance": mapping([("Asda", "Agecore")])})
+    assert labels(index.alliance(MODERN_TRADE)) == [MODERN_TRADE, None, None, None]
+    unmatched = index.unmatched("Buying Alliance", volumes=[1.0, 2.0, 3.0, 4.0])
+    assert unmatched.to_dict("records") == [
+        {"Customer": "Unknown", "Rows": 2, "Volumes": 7.0},
+        {"Customer": " modern  TRADE", "Rows": 1, "Volumes": 1.0},
+    ]
+    with pytest.raises(ValueError):
+        index.alliance_codes("Unknown Alliance")
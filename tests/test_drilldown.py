@@ -0,0 +1,53 @@
+"""The drill-down index against the aggregates and detail rows of the same view."""
+
+import numpy as np
+import pytest
+
+from risk_engine import ALLIANCE_TYPES, FLAGS, evaluate, get_calc
+from risk_engine.columns import ALLIANCE, CATEGORY, COMPARABLE
+
+FILTERS = {"none": {}, "area": {"Area": ["Europe"]}}
+
+
+@pytest.fixture(params=[(a, f, k) for a in ALLIANCE_TYPES for f in FLAGS for k in FILTERS],
+                ids=lambda p: "-".join(p))
+def view(request, inputs):
+    alliance_type, flag, filters = request.param
+    return evaluate(get_calc(inputs, alliance_type), inputs.corridor_index, FILTERS[filters], flag)
+
+
+def test_contributions_add_up_to_aggregates(view):
+    drill = view.drilldown
+    for country, net_sales, risk in view.agg[[view.group_col, "Net Sales", "Risk"]].itertuples(index=False):
+        rows = drill.contributions(country)
+        assert rows["Net Sales"].sum() == pytest.approx(net_sales, rel=1e-9)
+        assert rows["Risk"].sum() == pytest.approx(risk, rel=1e-9, abs=1e-9)
+        assert rows["Risk"].is_monotonic_decreasing
+    for country, category, net_sales, risk in view.agg2[[view.group_col, CATEGORY, "Net Sales", "Risk"]].itertuples(
+        index=False
+    ):
+        rows = drill.contributions(country, category)
+        assert (rows[CATEGORY] == category).all()
+        assert rows["Net Sales"].sum() == pytest.approx(net_sales, rel=1e-9)
+        assert rows["Risk"].sum() == pytest.approx(risk, rel=1e-9, abs=1e-9)
+
+
+def test_source_rows_and_generating_row(view):
+    drill, detail = view.drilldown, view.detail
+    keys = detail[[COMPARABLE, ALLIANCE]].astype(object)
+    for (comparable, alliance), group in keys.groupby([COMPARABLE, ALLIANCE], sort=False).groups.items():
+        rows = drill.source_rows(comparable, alliance)
+        np.testing.assert_array_equal(rows, detail.index.get_indexer(group))
+
+        prices = detail["Comparable Price"].iloc[rows]
+        generating = drill.generating_row(comparable, alliance)
+        if prices.isna().all():
+            assert generating is None
+            continue
+        assert generating["Comparable Price"] == prices.min()
+        assert (generating[COMPARABLE], generating[ALLIANCE]) == (comparable, alliance)
+        # The first row holding the min, as the Generating Country/Customer columns report it
+        assert generating.name == prices.idxmin()
+
+    assert len(drill.source_rows("no such comparable", "no such alliance")) == 0
+    assert drill.generating_row("no such comparable", "no such alliance") is None
@@ -0,0 +1,76 @@
+"""Multi-period Risk against a separate evaluation of each period's export."""
+
+import json
+import os
+
+import pytest
+
+from risk_engine import ALLIANCE_TYPES, FLAGS, evaluate, get_calc, load_inputs
+from risk_engine.columns import PERIOD
+from risk_engine.loader import WORKBOOKS
+from risk_engine.periods import PERIODS_FILE, PeriodStore, period_cube, period_files, period_totals, period_trends
+
+FILTERS = {"none": {}, "area": {"Area": ["Europe"]}}
+REFERENCE = [filename for name, (filename, _) in WORKBOOKS.items() if name != "export"]
+
+
+def link_workbooks(data_dir, directory, exports):
+    """``directory`` with the shipped reference workbooks and ``{name: shipped export}``, as symlinks."""
+    os.makedirs(directory, exist_ok=True)
+    for name, source in {**{f: f for f in REFERENCE}, **exports}.items():
+        os.symlink(os.path.join(data_dir, source), os.path.join(directory, name))
+    return directory
+
+
+@pytest.fixture(scope="module")
+def single_exports(data_dir, tmp_path_factory):
+    """Export filename -> the inputs with that export alone."""
+    root = tmp_path_factory.mktemp("single")
+    return {
+        export: load_inputs(link_workbooks(data_dir, root / export, {"Export.xlsx": export}), root / "cache")
+        for export in ("Export old.xlsx", "Export.xlsx")
+    }
+
+
+@pytest.fixture(scope="module")
+def manifest_dir(data_dir, tmp_path_factory):
+    directory = link_workbooks(data_dir, tmp_path_factory.mktemp("manifest"), {
+        "Export.xlsx": "Export.xlsx", "2025-08.xlsx": "Export old.xlsx", "2025-09.xlsx": "Export.xlsx",
+    })
+    with open(directory / PERIODS_FILE, "w") as fh:
+        json.dump({"2025-08": "2025-08.xlsx", "2025-09": "2025-09.xlsx"}, fh)
+    return directory
+
+
+def assert_periods_match(cube, flag, filters, alliance_type, expected_exports, single_exports):
+    totals = period_totals(period_trends(cube, flag)).set_index(PERIOD)
+    assert list(totals.index) == list(expected_exports)
+    for period, export in expected_exports.items():
+        inputs = single_exports[export]
+        view = evaluate(get_calc(inputs, alliance_type), inputs.corridor_index, filters, flag)
+        assert totals.loc[period, "Net Sales"] == pytest.approx(view.agg["Net Sales"].sum(), rel=1e-9)
+        assert totals.loc[period, "Risk"] == pytest.approx(view.agg["Risk"].sum(), rel=1e-9)
+    assert totals["Delta Risk"].iloc[1] == pytest.approx(totals["Risk"].iloc[1] - totals["Risk"].iloc[0])
+
+
+@pytest.mark.parametrize("filters", FILTERS.values(), ids=FILTERS.keys())
+@pytest.mark.parametrize("flag", FLAGS)
+@pytest.mark.parametrize("alliance_type", ALLIANCE_TYPES)
+def test_default_periods(data_dir, single_exports, tmp_path, alliance_type, flag, filters):
+    assert list(period_files(data_dir)) == ["previous", "current"]
+    cube = period_cube(data_dir, alliance_type, filters, store=PeriodStore(tmp_path / "periods"),
+                       cache_dir=tmp_path / "cache")
+    assert_periods_match(cube, flag, filters, alliance_type,
+                         {"previous": "Export old.xlsx", "current": "Export.xlsx"}, single_exports)
+
+
+@pytest.mark.parametrize("flag", FLAGS)
+@pytest.mark.parametrize("alliance_type", ALLIANCE_TYPES)
+def test_periods_file(manifest_dir, single_exports, tmp_path, alliance_type, flag):
+    store = PeriodStore(tmp_path / "periods")
+    computed = period_cube(manifest_dir, alliance_type, {}, store=store, cache_dir=tmp_path / "cache")
+    # The second call reads every period back from the store
+    stored = period_cube(manifest_dir, alliance_type, {}, store=store, cache_dir=tmp_path / "cache")
+    for cube in (computed, stored):
+        assert_periods_match(cube, flag, {}, alliance_type,
+                             {"2025-08": "Export old.xlsx", "2025-09": "Export.xlsx"}, single_exports)
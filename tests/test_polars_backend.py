@@ -0,0 +1,77 @@
+"""The Polars backend against the pandas engine."""
+
+from dataclasses import replace
+
+import pandas as pd
+import pytest
+
+from conftest import plain
+from risk_engine import ALLIANCE_TYPES, FLAGS, enrich, evaluate
+from risk_engine.columns import CUSTOMER
+
+pytest.importorskip("polars")
+
+from risk_engine import polars_backend  # noqa: E402
+from risk_engine.encoding import encode_inputs  # noqa: E402
+from synthetic import generate_inputs  # noqa: E402
+
+
+def assert_parity(inputs, alliance_type, filters, flag, rtol=1e-9):
+    expected = evaluate(enrich(inputs, alliance_type), inputs.corridor_index, filters, flag)
+    actual = polars_backend.evaluate(inputs, alliance_type, filters, flag)
+    for name in ("agg", "agg2", "detail"):
+        pd.testing.assert_frame_equal(plain(getattr(actual, name)), plain(getattr(expected, name)),
+                                      check_dtype=False, rtol=rtol, obj=f"{alliance_type} {name}")
+
+
+@pytest.mark.parametrize("filters", [{}, {"Area": ["Europe"], "Category": ["Tablets", "Spreads"]}],
+                         ids=["none", "area+category"])
+@pytest.mark.parametrize("flag", FLAGS)
+@pytest.mark.parametrize("alliance_type", ALLIANCE_TYPES)
+def test_shipped_data(inputs, alliance_type, flag, filters):
+    assert_parity(inputs, alliance_type, filters, flag)
+
+
+@pytest.fixture(scope="module")
+def synthetic():
+    return generate_inputs(rows=20_000, comparables=100, customers=40)
+
+
+@pytest.mark.parametrize("flag", FLAGS)
+@pytest.mark.parametrize("alliance_type", ALLIANCE_TYPES)
+def test_synthetic_data(synthetic, alliance_type, flag):
+    assert_parity(synthetic, alliance_type, {}, flag)
+
+
+@pytest.fixture(scope="module")
+def customer_variants():
+    """Synthetic inputs whose customer names differ from the mappings in case, spacing and non-ASCII letters."""
+    inputs = generate_inputs(rows=5_000, comparables=40, customers=20, encode=False)
+    # Customers 00004-00008 are in both Mapping BA and Mapping IA
+    variants = {
+        "Modern Trade": "MODERN  trade",
+        "Customer 00004": " CUSTOMER  00004 ",
+        "Customer 00005": "customer\t00005",
+        "Customer 00006": "Straße Markt",
+    }
+    export = inputs.export.assign(**{CUSTOMER: inputs.export[CUSTOMER].replace(variants)})
+
+    def mapping(frame):
+        frame = frame.assign(**{"Customer Name": frame["Customer Name"].replace({"Customer 00006": "STRASSE  MARKT"})})
+        # A customer mapped to two alliances: both backends take the first row
+        conflict = frame[frame["Customer Name"] == "Customer 00007"].assign(
+            **{"Customer Name": "customer 00007", "Alliance": "Conflicting Alliance"}
+        )
+        return pd.concat([frame, conflict], ignore_index=True)
+
+    inputs = replace(
+        inputs, export=export, mapping_ba=mapping(inputs.mapping_ba), mapping_ia=mapping(inputs.mapping_ia),
+        versions={name: f"{version}-variants" for name, version in inputs.versions.items()},
+    )
+    return encode_inputs(inputs)
+
+
+@pytest.mark.parametrize("flag", FLAGS)
+@pytest.mark.parametrize("alliance_type", ALLIANCE_TYPES)
+def test_customer_name_variants(customer_variants, alliance_type, flag):
+    assert_parity(customer_variants, alliance_type, {}, flag)
@@ -0,0 +1,196 @@
+"""The engine against the original single-script implementation, on the shipped workbooks."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import plain
+from risk_engine import ALLIANCE_TYPES, FLAGS, evaluate, get_calc
+
+FILTERS = {
+    "none": {},
+    "area": {"Area": ["Europe"]},
+    "country+category": {"Sellin Country Hierarchy - Country": ["Italy", "Germany"], "Category": ["Tablets"]},
+    "alliance": {"Alliance": ["Coopernic", "Eurelec", "Modern Trade"]},
+}
+
+
+# --- Original implementation (app.py before the risk_engine package), verbatim ---
+
+def baseline_calc(export, product_registry, mapping_ba, mapping_ia, mapping_area, alliance_type):
+    calc = export.copy()
+
+    if alliance_type == "Buying Alliance":
+        mapping = mapping_ba
+        calc = calc.merge(
+            mapping,
+            how="left",
+            left_on="Customer Hierarchy - Customer",
+            right_on="Customer Name"
+        ).drop(columns=["Customer Name"])
+
+    elif alliance_type == "International Alliance":
+        mapping = mapping_ia
+        calc = calc.merge(
+            mapping,
+            how="left",
+            left_on="Customer Hierarchy - Customer",
+            right_on="Customer Name"
+        ).drop(columns=["Customer Name"])
+
+    else:  # Modern Trade
+        calc["Alliance"] = calc["Customer Hierarchy - Customer"].apply(
+            lambda x: "Modern Trade" if str(x).strip().lower() == "modern trade" else None
+        )
+
+    # Exclude rows with NaN in Alliance by default
+    calc = calc[calc["Alliance"].notna()].copy()
+
+    # Comparable
+    calc = calc.merge(
+        product_registry[["Product Hierarchy - Product", "Product Hierarchy - Comparable Product"]],
+        how="left",
+        on="Product Hierarchy - Product"
+    ).rename(columns={"Product Hierarchy - Comparable Product": "Comparable"})
+
+    # Category
+    comp_to_cat = product_registry[[
+        "Product Hierarchy - Comparable Product", "Product Hierarchy - Category"
+    ]].drop_duplicates().rename(columns={
+        "Product Hierarchy - Comparable Product": "Comparable",
+        "Product Hierarchy - Category": "Category"
+    })
+    calc = calc.merge(comp_to_cat, how="left", on="Comparable")
+
+    # Mapping Area
+    calc = calc.merge(
+        mapping_area.rename(columns={"Country": "Sellin Country Hierarchy - Country"}),
+        how="left",
+        on="Sellin Country Hierarchy - Country"
+    )
+    return calc
+
+
+def baseline_recalculate(df, flag, corridors_lookup):
+    df = df.copy()
+
+    # Comparable Volumes & Prices
+    df["Comparable Volumes"] = df.groupby(
+        ["Comparable", "Sellin Country Hierarchy - Country", "Customer Hierarchy - Customer"]
+    )["Volumes [q]"].transform("sum")
+
+    df["Weighted Price Sum"] = df["3Net Price [EUR/kg]"] * df["Volumes [q]"]
+    grouped_price = df.groupby(
+        ["Comparable", "Sellin Country Hierarchy - Country", "Customer Hierarchy - Customer"]
+    )["Weighted Price Sum"].transform("sum")
+    df["Comparable Price"] = grouped_price / df["Comparable Volumes"]
+
+    # Min Price + Min Country + Min Customer (recalculated each time)
+    df["Min Price"] = df.groupby(["Comparable", "Alliance"])["Comparable Price"].transform("min")
+
+    min_price_country = df.loc[
+        df.groupby(["Comparable", "Alliance"])["Comparable Price"].idxmin(),
+        ["Comparable", "Alliance", "Sellin Country Hierarchy - Country"]
+    ].rename(columns={"Sellin Country Hierarchy - Country": "Generating Country"})
+
+    min_price_customer = df.loc[
+        df.groupby(["Comparable", "Alliance"])["Comparable Price"].idxmin(),
+        ["Comparable", "Alliance", "Customer Hierarchy - Customer"]
+    ].rename(columns={"Customer Hierarchy - Customer": "Generating Customer"})
+
+    df = df.drop(columns=["Generating Country", "Generating Customer"], errors="ignore")
+    df = df.merge(min_price_country, how="left", on=["Comparable", "Alliance"])
+    df = df.merge(min_price_customer, how="left", on=["Comparable", "Alliance"])
+
+    # Corridors - join twice
+    # Max Corridor by Suffering Country
+    df = df.merge(
+        corridors_lookup[["Country", "Attribute", "Corridor Max"]].rename(columns={"Corridor Max": "Max Corridor"}),
+        how="left",
+        left_on=["Sellin Country Hierarchy - Country", "Category"],
+        right_on=["Country", "Attribute"]
+    ).drop(columns=["Country", "Attribute"], errors="ignore")
+
+    # Min Corridor by Generating Country
+    df = df.merge(
+        corridors_lookup[["Country", "Attribute", "Corridor Min"]].rename(columns={"Corridor Min": "Min Corridor"}),
+        how="left",
+        left_on=["Generating Country", "Category"],
+        right_on=["Country", "Attribute"]
+    ).drop(columns=["Country", "Attribute"], errors="ignore")
+
+    # Calculations
+    df["Operating Corridor"] = df["Max Corridor"] / df["Min Corridor"]
+    df["Net Sales"] = df["Comparable Price"] * df["Volumes [q]"]
+    df["Min Price Net Sales"] = df["Min Price"] * df["Volumes [q]"]
+    df["Risk"] = (df["Net Sales"] - df["Min Price Net Sales"] * df["Operating Corridor"]).clip(lower=0).fillna(0)
+    df["% Risk"] = df["Risk"] / df["Net Sales"]
+
+    # Rename for display
+    df = df.rename(columns={
+        "Sellin Country Hierarchy - Country": "Suffering Country",
+        "Customer Hierarchy - Customer": "Suffering Customer"
+    })
+
+    return df
+
+
+def baseline_view(calc, corridors, filters, flag):
+    df = calc.copy()
+    for column, values in filters.items():
+        df = df[df[column].isin(values)]
+    df = baseline_recalculate(df, flag, corridors[["Country", "Attribute", "Corridor Min", "Corridor Max"]])
+
+    group_col = "Suffering Country" if flag == "suffered" else "Generating Country"
+    agg = df.groupby(group_col).agg({"Net Sales": "sum", "Risk": "sum"}).reset_index()
+    agg["% Risk"] = agg["Risk"] / agg["Net Sales"]
+    agg2 = df.groupby([group_col, "Category"]).agg({"Net Sales": "sum", "Risk": "sum"}).reset_index()
+    agg2["% Risk"] = agg2["Risk"] / agg2["Net Sales"]
+    return df, agg, agg2
+
+
+# --- Tests ---
+
+@pytest.fixture(scope="module")
+def workbooks(data_dir):
+    """The workbooks read as the original script read them."""
+    read = lambda name, **kwargs: pd.read_excel(os.path.join(data_dir, name), **kwargs)  # noqa: E731
+    mapping = {"usecols": [0, 1], "names": ["Customer Name", "Alliance"], "header": 0}
+    return {
+        "export": read("Export.xlsx"),
+        "product_registry": read("Product Registry.xlsx"),
+        "mapping_ba": read("Mapping BA.xlsx", **mapping),
+        "mapping_ia": read("Mapping IA.xlsx", **mapping),
+        "corridors": read("Corridors.xlsx"),
+        "mapping_area": read("Mapping Area.xlsx"),
+    }
+
+
+@pytest.fixture(scope="module")
+def baseline_calcs(workbooks):
+    frames = {k: v for k, v in workbooks.items() if k != "corridors"}
+    return {alliance_type: baseline_calc(alliance_type=alliance_type, **frames) for alliance_type in ALLIANCE_TYPES}
+
+
+@pytest.mark.parametrize("filters", FILTERS.values(), ids=FILTERS.keys())
+@pytest.mark.parametrize("flag", FLAGS)
+@pytest.mark.parametrize("alliance_type", ALLIANCE_TYPES)
+def test_matches_baseline(inputs, workbooks, baseline_calcs, alliance_type, flag, filters):
+    detail, agg, agg2 = baseline_view(baseline_calcs[alliance_type], workbooks["corridors"], filters, flag)
+    view = evaluate(get_calc(inputs, alliance_type), inputs.corridor_index, filters, flag)
+
+    pd.testing.assert_frame_equal(plain(view.detail), plain(detail), check_dtype=False)
+    pd.testing.assert_frame_equal(plain(view.agg), plain(agg), check_dtype=False)
+    pd.testing.assert_frame_equal(plain(view.agg2), plain(agg2), check_dtype=False)
+
+
+@pytest.mark.parametrize("flag", FLAGS)
+@pytest.mark.parametrize("alliance_type", ALLIANCE_TYPES)
+def test_aggregate_first_matches_baseline(inputs, workbooks, baseline_calcs, alliance_type, flag):
+    filters = FILTERS["area"]
+    _, agg, agg2 = baseline_view(baseline_calcs[alliance_type], workbooks["corridors"], filters, flag)
+    view = evaluate(get_calc(inputs, alliance_type), inputs.corridor_index, filters, flag, aggregate_first=True)
+
+    pd.testing.assert_frame_equal(plain(view.agg), plain(agg), check_dtype=False)
+    pd.testing.assert_frame_equal(plain(view.agg2), plain(agg2), check_dtype=False)
@@ -0,0 +1,85 @@
+"""What-if simulations against a full evaluation of the modified inputs."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from risk_engine import ALLIANCE_TYPES, FLAGS, evaluate, get_calc
+from risk_engine.columns import CATEGORY, COUNTRY, CUSTOMER, NET_PRICE
+from risk_engine.corridors import CorridorIndex
+from risk_engine.simulation import CorridorOverride, PriceOverride, simulate, sweep
+
+FILTERS = {"none": {}, "area": {"Area": ["Europe"]}}
+FACTORS = sweep(-0.3, 0.3, 5)
+# Columns attach_comparable adds to the calc, recomputed after a price change
+ATTACHED = ["Comparable Volumes", "Weighted Price Sum", "Comparable Price"]
+
+
+def modified_view(inputs, calc, filters, flag, overrides, scenario):
+    """``evaluate`` on the corridors and net prices of one scenario, changed in the inputs themselves."""
+    corridors = inputs.corridors.astype({"Corridor Max": float, "Corridor Min": float})
+    calc = calc.drop(columns=ATTACHED)
+    calc.attrs = {}
+    for override in overrides:
+        factor = override.factors[scenario % len(override.factors)]
+        if isinstance(override, CorridorOverride):
+            cell = (corridors["Country"] == override.country) & (corridors["Attribute"] == override.category)
+            corridors.loc[cell, override.column] *= factor
+        else:
+            selected = np.ones(len(calc), dtype=bool)
+            for column, values in override.where.items():
+                selected &= calc[column].isin(values).to_numpy()
+            calc.loc[selected, NET_PRICE] *= factor
+    index = CorridorIndex(corridors, inputs.dimensions["Country"], inputs.dimensions["Category"])
+    return evaluate(calc, index, filters, flag)
+
+
+def scenarios(calc):
+    """Overrides of each type on the busiest corridor cell and customer of ``calc``."""
+    country, category = calc.groupby([COUNTRY, CATEGORY], observed=True).size().idxmax()
+    customer = calc[CUSTOMER].value_counts().index[0]
+    max_override = CorridorOverride(country, category, "Corridor Max", FACTORS)
+    min_override = CorridorOverride(country, category, "Corridor Min", FACTORS[::-1])
+    price_override = PriceOverride(FACTORS, {CUSTOMER: [customer]})
+    return {
+        "corridor max": [max_override],
+        "corridor min": [min_override],
+        "price": [price_override],
+        "price everywhere": [PriceOverride(FACTORS)],
+        "combined": [max_override, min_override, price_override],
+        "no-op": [CorridorOverride(country, category, "Corridor Max", (1.0,)), PriceOverride((1.0,))],
+    }
+
+
+@pytest.mark.parametrize("case", ["corridor max", "corridor min", "price", "price everywhere", "combined", "no-op"])
+@pytest.mark.parametrize("filters", FILTERS.values(), ids=FILTERS.keys())
+@pytest.mark.parametrize("flag", FLAGS)
+@pytest.mark.parametrize("alliance_type", ALLIANCE_TYPES)
+def test_matches_modified_inputs(inputs, alliance_type, flag, filters, case):
+    calc = get_calc(inputs, alliance_type)
+    overrides = scenarios(calc)[case]
+    simulation = simulate(calc, inputs.corridor_index, filters, flag, overrides)
+
+    for scenario, totals in simulation.totals.iterrows():
+        expected = modified_view(inputs, calc, filters, flag, overrides, scenario)
+        assert totals["Net Sales"] == pytest.approx(expected.agg["Net Sales"].sum(), rel=1e-9)
+        assert totals["Risk"] == pytest.approx(expected.agg["Risk"].sum(), rel=1e-9)
+
+        by_country = simulation.by_country[simulation.by_country["Scenario"] == scenario]
+        actual = by_country.set_index(simulation.group_col)[["Net Sales", "Risk"]]
+        expected = expected.agg.set_index(expected.group_col)[["Net Sales", "Risk"]]
+        actual.index, expected.index = actual.index.astype(str), expected.index.astype(str)
+        pd.testing.assert_frame_equal(actual.sort_index(), expected.sort_index(), rtol=1e-9, check_names=False)
+
+
+@pytest.mark.parametrize("flag", FLAGS)
+def test_no_op_override(inputs, flag):
+    calc = get_calc(inputs, ALLIANCE_TYPES[0])
+    view = evaluate(calc, inputs.corridor_index, {}, flag)
+    simulation = simulate(calc, inputs.corridor_index, {}, flag, scenarios(calc)["no-op"])
+
+    assert len(simulation.totals) == 1
+    assert simulation.totals["Delta Risk"].iloc[0] == pytest.approx(0, abs=1e-6)
+    assert simulation.totals["Delta Net Sales"].iloc[0] == pytest.approx(0, abs=1e-6)
+    assert simulation.totals["Risk"].iloc[0] == pytest.approx(view.agg["Risk"].sum(), rel=1e-12)
+    assert simulation.by_country["Delta Risk"].abs().max() == pytest.approx(0, abs=1e-6)
@@ -0,0 +1,50 @@
+"""Chunked writers on object and missing-value columns."""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from risk_engine.writers import to_bytes, write_frame
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "Country": pd.Series(["Italy", None, "Spain", "France", None], dtype=object),
+        # Missing in the whole first chunk
+        "Category": pd.Series([None, None, "Tablets", pd.NA, "Snacks"], dtype=object),
+        "Empty": pd.Series([None] * 5, dtype=object),
+        "Area": pd.Categorical(["Europe", None, "Europe", "Europe", None]),
+        "Risk": [1.5, np.nan, 0.0, 2.25, 3.0],
+    })
+
+
+@pytest.mark.parametrize("chunk_rows", [2, 50_000])
+def test_parquet_object_and_missing_columns(frame, chunk_rows):
+    buffer = io.BytesIO()
+    write_frame(frame, buffer, "parquet", chunk_rows=chunk_rows)
+    result = pd.read_parquet(io.BytesIO(buffer.getvalue()))
+
+    assert list(result.columns) == list(frame.columns)
+    for column in ("Country", "Category"):
+        assert result[column].isna().tolist() == frame[column].isna().tolist()
+        assert result[column].dropna().tolist() == frame[column].dropna().tolist()
+    assert result["Empty"].isna().all()
+    pd.testing.assert_series_equal(result["Area"].astype(object), frame["Area"].astype(object), check_dtype=False)
+    np.testing.assert_array_equal(result["Risk"].to_numpy(), frame["Risk"].to_numpy())
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "csv", "xlsx"])
+def test_selected_columns_to_file(frame, fmt, tmp_path):
+    path = tmp_path / f"table.{fmt}"
+    write_frame(frame, str(path), fmt, columns=["Country", "Risk"], chunk_rows=2)
+    read = {"parquet": pd.read_parquet, "csv": pd.read_csv, "xlsx": pd.read_excel}[fmt]
+    result = read(path)
+
+    assert list(result.columns) == ["Country", "Risk"]
+    assert result["Country"].isna().tolist() == frame["Country"].isna().tolist()
+    if fmt != "xlsx":
+        # Same bytes as the download path (xlsx files embed their creation time)
+        assert path.read_bytes() == to_bytes(frame, fmt, columns=["Country", "Risk"], chunk_rows=2)